@@ -0,0 +1,100 @@
+#!/usr/bin/python3
+#
+#   Copyright (C) 2008-2015 by Nicolas Piganeau
+#   npi@m4x.org
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 2 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program; if not, write to the
+#   Free Software Foundation, Inc.,
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+
+"""Reports archive size and write/read times of each .ts2 compression codec.
+
+Usage: python3 benchmark-codecs.py [file or directory ...]
+
+By default, the bundled simulations in data/ and simulations/ are used.
+"""
+
+import argparse
+import io
+import os
+import time
+import zipfile
+
+from ts2 import binformat
+from ts2.utils import settings
+
+
+def findSimulations(paths):
+    """Yields the simulation files found in paths."""
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+        for root, dirs, files in os.walk(path):
+            for fileName in sorted(files):
+                if fileName.endswith((".ts2", ".tsg")):
+                    yield os.path.join(root, fileName)
+
+
+def benchmark(memberName, data, compressType, level, repeat):
+    """Returns (size, write time, read time) of data compressed with
+    compressType."""
+    writeTime = readTime = 0.0
+    for _ in range(repeat):
+        buffer = io.BytesIO()
+        start = time.perf_counter()
+        with zipfile.ZipFile(buffer, "w") as zipArchive:
+            zipArchive.writestr(memberName, data, compress_type=compressType,
+                                compresslevel=level)
+        writeTime += time.perf_counter() - start
+        start = time.perf_counter()
+        with zipfile.ZipFile(buffer) as zipArchive:
+            zipArchive.read(memberName)
+        readTime += time.perf_counter() - start
+    return len(buffer.getvalue()), writeTime / repeat, readTime / repeat
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser("benchmark-codecs")
+    parser.add_argument("paths", nargs="*", default=["data", "simulations"],
+                        help=".ts2 files or directories to benchmark")
+    parser.add_argument("-l", "--level", type=int, default=None,
+                        help="compression level (codec default if omitted)")
+    parser.add_argument("-r", "--repeat", type=int, default=5,
+                        help="number of runs to average")
+    args = parser.parse_args()
+
+    print("%-40s %-8s %10s %10s %10s" % ("File", "Codec", "Size (kB)",
+                                         "Write (ms)", "Read (ms)"))
+    for fileName in findSimulations(args.paths):
+        try:
+            with zipfile.ZipFile(fileName) as ts2Zip:
+                if binformat.MEMBER_NAME in ts2Zip.namelist():
+                    memberName = binformat.MEMBER_NAME
+                else:
+                    memberName = "simulation.json"
+                data = ts2Zip.read(memberName)
+        except (OSError, KeyError, zipfile.BadZipFile) as err:
+            print("%-40s skipped: %s" % (os.path.basename(fileName)[:40],
+                                         err))
+            continue
+        for codec, compressType in settings.ARCHIVE_CODECS.items():
+            level = settings.compressionLevel(compressType, args.level)
+            size, writeTime, readTime = benchmark(memberName, data,
+                                                  compressType, level,
+                                                  args.repeat)
+            print("%-40s %-8s %10.1f %10.2f %10.2f" % (
+                os.path.basename(fileName)[:40], codec, size / 1024,
+                writeTime * 1000, readTime * 1000
+            ))
@@ -34,6 +34,29 @@ if __name__ == '__main__':
                         default=False)
     parser.add_argument("-e", "--edit", dest="edit", help="Open sim in editor",
                         action="store_true", default=False)
+    parser.add_argument("--events", dest="events", metavar="FILE",
+                        help="Record the events of the game to FILE",
+                        type=str, default=None)
+    parser.add_argument("--headless", dest="headless",
+                        help="Run the game without window at full speed "
+                             "until the --until time",
+                        action="store_true", default=False)
+    parser.add_argument("--until", dest="until", metavar="HH:MM:SS",
+                        help="Sim time at which a headless run stops",
+                        type=str, default=None)
+    parser.add_argument("--snapshots", dest="snapshots", metavar="DIR",
+                        help="Write PNG snapshots of the scenery of a "
+                             "headless run to DIR",
+                        type=str, default=None)
+    parser.add_argument("--snapshot-interval", dest="snapshot_interval",
+                        metavar="SECONDS",
+                        help="Sim time between two snapshots (default 60)",
+                        type=float, default=60)
+    parser.add_argument("--snapshot-size", dest="snapshot_size",
+                        metavar="WxH",
+                        help="Size of the snapshots in pixels "
+                             "(default 1920x1080)",
+                        type=str, default="1920x1080")
     parser.add_argument("file", help=".ts2 file to open/edit", type=str,
                         nargs='?')
     args = parser.parse_args()
@@ -41,5 +64,24 @@ if __name__ == '__main__':
     if args.edit and args.file is None:
         sys.exit("ERROR: Need a file with -e option")
 
+    if args.headless:
+        if args.file is None or args.until is None:
+            sys.exit("ERROR: Need a file and --until with --headless option")
+        import ts2.utils
+        args.until = ts2.utils.timeFromString(args.until)
+        if args.until is None:
+            sys.exit("ERROR: Invalid --until time")
+        try:
+            args.snapshot_size = tuple(
+                int(x) for x in args.snapshot_size.lower().split("x")
+            )
+            assert len(args.snapshot_size) == 2
+        except (ValueError, AssertionError):
+            sys.exit("ERROR: Invalid --snapshot-size")
+        import ts2.application
+        sys.exit(ts2.application.Batch(args=args))
+    elif args.snapshots:
+        sys.exit("ERROR: --snapshots needs the --headless option")
+
     import ts2.application
     ts2.application.Main(args=args)
@@ -0,0 +1,115 @@
+#
+#   Copyright (C) 2008-2015 by Nicolas Piganeau
+#   npi@m4x.org
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 2 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program; if not, write to the
+#   Free Software Foundation, Inc.,
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+
+import math
+import os
+import sys
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from Qt import QtCore, QtWidgets, Qt
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+from ts2.game import notifier
+from ts2.gui import trainlistview
+from ts2.trains import TrainStatus, TrainListModel
+
+TRAIN_COUNT = 1000
+
+
+class Train:
+    """Train with only the attributes read by the train list."""
+
+    def __init__(self, serviceCode):
+        self.serviceCode = serviceCode
+        self.status = TrainStatus.RUNNING
+        self.currentService = None
+        self.nextPlaceIndex = None
+
+
+class Simulation:
+    """Simulation with only the attributes read by the train list."""
+
+    def __init__(self, trains):
+        self.trains = trains
+        self.notifier = notifier.ModelNotifier()
+
+
+class CountingProxyModel(trainlistview.TrainListProxyModel):
+    """TrainListProxyModel counting its comparisons."""
+
+    comparisons = 0
+
+    def lessThan(self, left, right):
+        self.comparisons += 1
+        return super().lessThan(left, right)
+
+
+class TrainListProxyModelTest(unittest.TestCase):
+
+    def setUp(self):
+        self.trains = [Train("S%04i" % (2 * i)) for i in range(TRAIN_COUNT)]
+        self.simulation = Simulation(self.trains)
+        self.model = TrainListModel(self.simulation)
+        self.proxyModel = CountingProxyModel()
+        self.proxyModel.setSourceModel(self.model)
+        self.proxyModel.sort(0, Qt.AscendingOrder)
+
+    def serviceCodes(self):
+        return [self.proxyModel.index(row, 0).data()
+                for row in range(self.proxyModel.rowCount())]
+
+    def testChangedRowsOnly(self):
+        """Changing two distant trains only moves these two rows."""
+        before = self.serviceCodes()
+        self.trains[10].serviceCode = "S9999"
+        self.trains[900].serviceCode = "S0000A"
+        self.proxyModel.comparisons = 0
+        self.model.update(10)
+        self.model.update(900)
+        self.simulation.notifier.flush()
+        after = self.serviceCodes()
+        self.assertEqual(after, sorted(after))
+        self.assertEqual(after[-1], "S9999")
+        self.assertEqual(after[1], "S0000A")
+        unchanged = [code for code in before
+                     if code not in ("S0020", "S1800")]
+        self.assertEqual([code for code in after
+                          if code not in ("S9999", "S0000A")], unchanged)
+        # Re-sorting the span between the two rows would compare the
+        # hundreds of rows within it
+        self.assertLess(self.proxyModel.comparisons,
+                        8 * math.log2(TRAIN_COUNT))
+
+    def testTrainId(self):
+        """Proxy rows map to the ids of the trains."""
+        self.trains[10].serviceCode = "S9999"
+        self.model.update(10)
+        self.simulation.notifier.flush()
+        last = self.proxyModel.index(TRAIN_COUNT - 1, 0)
+        self.assertEqual(self.proxyModel.trainId(last), 10)
+        self.assertEqual(self.proxyModel.trainIndex(10).row(),
+                         TRAIN_COUNT - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+#
+#   Copyright (C) 2008-2015 by Nicolas Piganeau
+#   npi@m4x.org
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 2 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program; if not, write to the
+#   Free Software Foundation, Inc.,
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+
+import os
+import sys
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from Qt import QtWidgets
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+from ts2 import binformat, utils
+
+
+class TypeRegistryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = utils.TypeRegistry()
+        self.registry.registerFactory("Point", lambda dct: (dct["x"],))
+
+    def testObjectHook(self):
+        self.assertEqual(self.registry.objectHook({"__type__": "Point",
+                                                   "x": 1}), (1,))
+        self.assertEqual(self.registry.objectHook({"x": 1}), {"x": 1})
+
+    def testInvalidType(self):
+        """Unregistered types, even empty, are not loaded as plain
+        dicts."""
+        for typeName in ("", "Unknown"):
+            with self.assertRaises(utils.FormatException):
+                self.registry.objectHook({"__type__": typeName})
+            with self.assertRaises(utils.FormatException):
+                binformat.loads(binformat.dumps({"__type__": typeName}),
+                                self.registry)
+
+    def testChildRegistry(self):
+        child = utils.TypeRegistry(self.registry)
+        child.registerFactory("Other", lambda dct: None)
+        self.assertEqual(child.objectHook({"__type__": "Point", "x": 2}),
+                         (2,))
+        with self.assertRaises(utils.FormatException):
+            self.registry.objectHook({"__type__": "Other"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -17,14 +17,15 @@
 #   Free Software Foundation, Inc.,
 #   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
 #
+import os
 import sys
 
 from Qt import QtCore, QtGui, QtWidgets
 
 
-from ts2 import mainwindow
+from ts2 import mainwindow, simulation
 from ts2 import ressources_rc
-from ts2.gui import dialogs
+from ts2.gui import dialogs, snapshot
 
 from ts2 import __APP_SHORT__, __VERSION__
 
@@ -56,5 +57,44 @@ def Main(args=None):
     #     dialogs.ExceptionDialog.popupException(None)
     #     return 1
 
+
+BATCH_STEP = 1000
+"""Sim time in milliseconds advanced at a time by batch runs"""
+
+
+def Batch(args):
+    """Runs a simulation without window at full speed, from the time it was
+    saved until args.until, recording its events and snapshots of its scene
+    as requested by args.
+
+    :param object args: Command line args from argparse
+    :return: the exit code
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QtWidgets.QApplication(sys.argv)
+    app.setApplicationName(__APP_SHORT__)
+    sim = simulation.loadFile(None, args.file)
+    sim.pause()
+    if args.events:
+        sim.recordEvents(args.events)
+    renderer = None
+    if args.snapshots:
+        width, height = args.snapshot_size
+        renderer = snapshot.SnapshotRenderer(
+            sim, args.snapshots, args.snapshot_interval, width, height
+        )
+    try:
+        while sim.currentTime < args.until:
+            sim.advance(min(BATCH_STEP,
+                            round((args.until - sim.currentTime) * 1000)))
+            if renderer is not None:
+                renderer.flush()
+    finally:
+        if renderer is not None:
+            renderer.stop()
+        sim.close()
+    return 0
+
+
 if __name__ == "__main__":
     Main()
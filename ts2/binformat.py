@@ -0,0 +1,399 @@
+#
+#   Copyright (C) 2008-2015 by Nicolas Piganeau
+#   npi@m4x.org
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 2 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program; if not, write to the
+#   Free Software Foundation, Inc.,
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+
+"""Compact binary encoding of a simulation.
+
+This is an alternative to the JSON encoding, meant for files that are written
+and read often (e.g. saved games). It encodes the same data as the
+``for_json()`` methods of the simulation objects, but:
+
+- All strings are stored once in a string table and referenced by index.
+- Collections of objects (track items, routes, services, trains, etc.) are
+  stored as tables: objects are grouped by ``__type__`` and each attribute is
+  stored as a column. Numeric and string columns are stored as packed arrays.
+- Objects are built directly from their table with the constructor of their
+  type, looked up once per table in the :class:`~ts2.utils.TypeRegistry`.
+
+JSON remains the interchange format of TS2.
+"""
+
+import array
+import io
+import struct
+import sys
+
+from Qt import QtWidgets
+
+from ts2 import utils
+
+translate = QtWidgets.qApp.translate
+
+MAGIC = b"TS2B"
+VERSION = 1
+MEMBER_NAME = "simulation.bin"
+"""Name of the binary member inside a .ts2 zip archive."""
+
+# Value tags
+_NONE, _TRUE, _FALSE, _INT, _FLOAT, _STR, _LIST, _DICT, _TABLE_LIST, \
+    _TABLE_DICT, _EMBEDDED = range(11)
+
+# Column kinds
+_COL_INT, _COL_FLOAT, _COL_STR, _COL_VALUES = range(4)
+
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def _packArray(typeCode, values):
+    """Returns values packed as a little endian array of typeCode."""
+    arr = array.array(typeCode, values)
+    if _BIG_ENDIAN:
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _unpackArray(typeCode, data):
+    """Returns the list of values of the little endian array in data."""
+    arr = array.array(typeCode)
+    arr.frombytes(data)
+    if _BIG_ENDIAN:
+        arr.byteswap()
+    return arr.tolist()
+
+
+def _plain(value):
+    """Returns value, or its JSON representation if it has one."""
+    forJson = getattr(value, "for_json", None)
+    if forJson is not None:
+        return forJson()
+    return value
+
+
+class Encoded:
+    """A value already encoded with :func:`dumps`.
+
+    It is embedded as is when written, so that parts of a document that do
+    not change can be encoded once and reused in several documents."""
+
+    def __init__(self, data):
+        """Constructor for the Encoded class.
+
+        :param bytes data: The value encoded with :func:`dumps`
+        """
+        self.data = data
+
+
+class _Writer:
+    """Encodes a graph of objects into the binary format."""
+
+    def __init__(self):
+        self.buffer = io.BytesIO()
+        self.strings = {}
+
+    def write(self, data):
+        self.buffer.write(data)
+
+    def string(self, text):
+        """Returns the index of text in the string table."""
+        index = self.strings.get(text)
+        if index is None:
+            index = len(self.strings)
+            self.strings[text] = index
+        return index
+
+    def value(self, value):
+        """Writes a single value of any type."""
+        value = _plain(value)
+        if isinstance(value, Encoded):
+            self.write(_U8.pack(_EMBEDDED) + _U32.pack(len(value.data)))
+            self.write(value.data)
+        elif value is None:
+            self.write(_U8.pack(_NONE))
+        elif value is True:
+            self.write(_U8.pack(_TRUE))
+        elif value is False:
+            self.write(_U8.pack(_FALSE))
+        elif isinstance(value, int) and _INT64_MIN <= value <= _INT64_MAX:
+            self.write(_U8.pack(_INT) + _I64.pack(value))
+        elif isinstance(value, (int, float)):
+            self.write(_U8.pack(_FLOAT) + _F64.pack(value))
+        elif isinstance(value, str):
+            self.write(_U8.pack(_STR) + _U32.pack(self.string(value)))
+        elif isinstance(value, dict):
+            items = [_plain(v) for v in value.values()]
+            if self.isTable(items):
+                self.write(_U8.pack(_TABLE_DICT))
+                self.table(list(value.keys()), items)
+            else:
+                self.write(_U8.pack(_DICT) + _U32.pack(len(value)))
+                for key, item in zip(value.keys(), items):
+                    self.value(key)
+                    self.value(item)
+        elif isinstance(value, (list, tuple)):
+            items = [_plain(v) for v in value]
+            if self.isTable(items):
+                self.write(_U8.pack(_TABLE_LIST))
+                self.table(None, items)
+            else:
+                self.write(_U8.pack(_LIST) + _U32.pack(len(items)))
+                for item in items:
+                    self.value(item)
+        else:
+            raise TypeError("Cannot encode %r" % value)
+
+    @staticmethod
+    def isTable(items):
+        """Returns True if items is a non empty list of typed objects."""
+        if not items:
+            return False
+        for item in items:
+            if not isinstance(item, dict) or "__type__" not in item:
+                return False
+        return True
+
+    def table(self, keys, items):
+        """Writes items, which are all typed dicts, as a table. If keys is
+        not None, the table is a dict with the given keys."""
+        self.write(_U32.pack(len(items)))
+        if keys is not None:
+            self.column(keys)
+        groups = {}
+        groupIndexes = {}
+        rowGroups = []
+        for item in items:
+            typeName = item["__type__"]
+            if typeName not in groups:
+                groupIndexes[typeName] = len(groups)
+                groups[typeName] = []
+            groups[typeName].append(item)
+            rowGroups.append(groupIndexes[typeName])
+        self.write(_U32.pack(len(groups)))
+        self.write(_packArray("I", rowGroups))
+        for typeName, rows in groups.items():
+            attributes = {}
+            for row in rows:
+                attributes.update(dict.fromkeys(row))
+            del attributes["__type__"]
+            self.write(_U32.pack(self.string(typeName)) +
+                       _U32.pack(len(attributes)))
+            for attribute in attributes:
+                mask = [attribute in row for row in rows]
+                self.write(_U32.pack(self.string(attribute)))
+                if all(mask):
+                    self.write(_U8.pack(0))
+                    self.column([row[attribute] for row in rows])
+                else:
+                    self.write(_U8.pack(1) + bytes(mask))
+                    self.column([row[attribute] for row in rows
+                                 if attribute in row])
+
+    def column(self, values):
+        """Writes values as a column, packed if they are all of the same
+        simple type."""
+        self.write(_U32.pack(len(values)))
+        types = set(type(v) for v in values)
+        if types == {int} and \
+                _INT64_MIN <= min(values) and max(values) <= _INT64_MAX:
+            self.write(_U8.pack(_COL_INT))
+            self.write(_packArray("q", values))
+        elif types == {float}:
+            self.write(_U8.pack(_COL_FLOAT))
+            self.write(_packArray("d", values))
+        elif types == {str}:
+            self.write(_U8.pack(_COL_STR))
+            self.write(_packArray("I", [self.string(v) for v in values]))
+        else:
+            self.write(_U8.pack(_COL_VALUES))
+            for value in values:
+                self.value(value)
+
+    def output(self):
+        """Returns the whole encoded document, with its header and string
+        table."""
+        encodedStrings = [s.encode("utf-8") for s in self.strings]
+        return b"".join([
+            MAGIC,
+            _U16.pack(VERSION),
+            _U32.pack(len(encodedStrings)),
+            _packArray("I", [len(s) for s in encodedStrings]),
+            b"".join(encodedStrings),
+            self.buffer.getvalue()
+        ])
+
+
+class _Reader:
+    """Decodes a document in the binary format."""
+
+    def __init__(self, data, registry):
+        self.data = memoryview(data)
+        self.pos = 0
+        self.registry = registry
+        self.strings = []
+
+    def read(self, size):
+        start = self.pos
+        self.pos += size
+        return self.data[start:self.pos]
+
+    def unpack(self, fmt):
+        result = fmt.unpack_from(self.data, self.pos)[0]
+        self.pos += fmt.size
+        return result
+
+    def header(self):
+        """Reads the header and the string table."""
+        if bytes(self.read(len(MAGIC))) != MAGIC:
+            raise utils.FormatException(
+                translate("binformat", "Not a TS2 binary simulation file")
+            )
+        version = self.unpack(_U16)
+        if version > VERSION:
+            raise utils.FormatException(
+                translate("binformat",
+                          "Unsupported binary file version %i") % version
+            )
+        count = self.unpack(_U32)
+        lengths = _unpackArray("I", self.read(4 * count))
+        strings = []
+        for length in lengths:
+            strings.append(str(self.read(length), "utf-8"))
+        self.strings = strings
+
+    def value(self):
+        """Reads a single value of any type."""
+        tag = self.unpack(_U8)
+        if tag == _NONE:
+            return None
+        elif tag == _TRUE:
+            return True
+        elif tag == _FALSE:
+            return False
+        elif tag == _INT:
+            return self.unpack(_I64)
+        elif tag == _FLOAT:
+            return self.unpack(_F64)
+        elif tag == _STR:
+            return self.strings[self.unpack(_U32)]
+        elif tag == _LIST:
+            return [self.value() for _ in range(self.unpack(_U32))]
+        elif tag == _DICT:
+            dct = {}
+            for _ in range(self.unpack(_U32)):
+                key = self.value()
+                dct[key] = self.value()
+            return self.registry.objectHook(dct)
+        elif tag == _TABLE_LIST:
+            return self.table(False)
+        elif tag == _TABLE_DICT:
+            return self.table(True)
+        elif tag == _EMBEDDED:
+            return loads(self.read(self.unpack(_U32)), self.registry)
+        raise utils.FormatException(
+            translate("binformat", "Corrupted binary file")
+        )
+
+    def table(self, isDict):
+        """Reads a table and returns the list, or the dict, of its objects."""
+        count = self.unpack(_U32)
+        keys = self.column() if isDict else None
+        groupCount = self.unpack(_U32)
+        rowGroups = _unpackArray("I", self.read(4 * count))
+        groups = []
+        for _ in range(groupCount):
+            typeName = self.strings[self.unpack(_U32)]
+            rowCount = rowGroups.count(len(groups))
+            attributes = []
+            columns = []
+            masks = []
+            for _ in range(self.unpack(_U32)):
+                attributes.append(self.strings[self.unpack(_U32)])
+                if self.unpack(_U8):
+                    masks.append(bytes(self.read(rowCount)))
+                else:
+                    masks.append(None)
+                columns.append(self.column())
+            if any(mask is not None for mask in masks):
+                rows = [{"__type__": typeName} for _ in range(rowCount)]
+                for attribute, mask, column in zip(attributes, masks,
+                                                   columns):
+                    if mask is None:
+                        mask = [1] * rowCount
+                    values = iter(column)
+                    for row, present in zip(rows, mask):
+                        if present:
+                            row[attribute] = next(values)
+            else:
+                attributes.append("__type__")
+                columns.append([typeName] * rowCount)
+                rows = [dict(zip(attributes, values))
+                        for values in zip(*columns)]
+            constructor = self.registry.constructor(typeName)
+            groups.append(iter([constructor(row) for row in rows]))
+        objects = [next(groups[group]) for group in rowGroups]
+        if isDict:
+            return dict(zip(keys, objects))
+        return objects
+
+    def column(self):
+        """Reads a column and returns the list of its values."""
+        count = self.unpack(_U32)
+        kind = self.unpack(_U8)
+        if kind == _COL_INT:
+            return _unpackArray("q", self.read(8 * count))
+        elif kind == _COL_FLOAT:
+            return _unpackArray("d", self.read(8 * count))
+        elif kind == _COL_STR:
+            strings = self.strings
+            return [strings[i] for i in _unpackArray("I",
+                                                     self.read(4 * count))]
+        return [self.value() for _ in range(count)]
+
+
+def dumps(obj):
+    """Returns obj encoded in the binary format.
+
+    :param obj: Any object that can be dumped with ``json.dumps(obj,
+        for_json=True)``, typically a
+        :class:`~ts2.simulation.Simulation`.
+    :rtype: bytes
+    """
+    writer = _Writer()
+    writer.value(obj)
+    return writer.output()
+
+
+def loads(data, registry):
+    """Decodes data in the binary format and returns the root object.
+
+    :param bytes data: The encoded document
+    :param registry: The :class:`~ts2.utils.TypeRegistry` building the
+        objects of each ``__type__`` found in the file.
+    """
+    reader = _Reader(data, registry)
+    reader.header()
+    return reader.value()
+
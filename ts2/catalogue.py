@@ -0,0 +1,225 @@
+#
+#   Copyright (C) 2008-2015 by Nicolas Piganeau
+#   npi@m4x.org
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 2 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program; if not, write to the
+#   Free Software Foundation, Inc.,
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+
+import os
+import zipfile
+
+import simplejson as json
+from Qt import QtCore
+
+from ts2 import utils, jsonstream
+from ts2.utils import settings
+
+CATALOGUE_FILE = "catalogue.json"
+"""Name of the catalogue cache file in the user data directory"""
+
+METADATA_MEMBER = "metadata.json"
+"""Name of the uncompressed metadata member of .ts2 archives"""
+
+_runningWorkers = set()
+
+
+def metadata(options, trackItems, routes, services, trains):
+    """Returns the metadata dict of a simulation.
+
+    :param dict options: The simulation options, as saved
+    :param trackItems: The track items, or their JSON data
+    :param routes: The routes, or their JSON data
+    :param services: The services, or their JSON data
+    :param trains: The trains, or their JSON data
+    """
+    return {
+        "title": options.get("title", ""),
+        "description": options.get("description", ""),
+        "version": options.get("version"),
+        "startTime": options.get("currentTime"),
+        "trackItems": len(trackItems),
+        "routes": len(routes),
+        "services": len(services),
+        "trains": len(trains)
+    }
+
+
+def writeMetadata(zipArchive, data):
+    """Writes the metadata dict data to zipArchive, uncompressed so that it
+    can be read without touching the simulation payload."""
+    zipArchive.writestr(METADATA_MEMBER, utils.to_json(data),
+                        compress_type=zipfile.ZIP_STORED)
+
+
+def readMetadata(filePath):
+    """Reads the metadata member of a .ts2 archive.
+
+    :param str filePath: Path of the .ts2 file
+    :return: the metadata dict, or None if the archive has no metadata
+             member, as is the case of files written by older versions.
+    """
+    with zipfile.ZipFile(filePath) as zipArchive:
+        try:
+            data = zipArchive.read(METADATA_MEMBER)
+        except KeyError:
+            return None
+    return json.loads(data.decode("utf-8"))
+
+
+def readInfo(filePath):
+    """Reads the information shown in the catalogue from a simulation file.
+
+    The metadata member is used if the archive has one. Otherwise, only the
+    options section of the simulation is decoded when it comes first in the
+    file, which is the case of all files written by TS2.
+
+    :param str filePath: Path of the .ts2 file
+    :return: dict with at least the title and description of the simulation
+    """
+    info = readMetadata(filePath)
+    if info is not None:
+        return info
+    info = {"title": "", "description": ""}
+    with zipfile.ZipFile(filePath) as zipArchive:
+        if "simulation.json" not in zipArchive.namelist():
+            return info
+        with zipArchive.open("simulation.json") as file:
+            reader = jsonstream.JsonStreamReader(file)
+            for key in reader.members():
+                value = reader.value()
+                if key == "options":
+                    info["title"] = value.get("title", "")
+                    info["description"] = value.get("description", "")
+                    info["version"] = value.get("version")
+                    info["startTime"] = value.get("currentTime")
+                    break
+    return info
+
+
+class SimulationCatalogue:
+    """Persistent cache of the information of simulation files.
+
+    Entries are keyed by file path and are valid as long as the modification
+    time and size of the file are unchanged. The cache is stored as JSON in
+    the user data directory.
+    """
+
+    def __init__(self, fileName=None):
+        """Constructor for the SimulationCatalogue class.
+
+        :param str fileName: Path of the cache file. Defaults to
+                             CATALOGUE_FILE in the user data directory.
+        """
+        if fileName is None:
+            fileName = os.path.join(settings.userDataDir, CATALOGUE_FILE)
+        self.fileName = fileName
+        self._entries = {}
+        self.load()
+
+    def load(self):
+        """Loads the cache from disk. A missing or corrupted cache file is
+        silently discarded."""
+        try:
+            with open(self.fileName, encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def save(self):
+        """Writes the cache to disk."""
+        try:
+            tmpFileName = self.fileName + ".tmp"
+            with open(tmpFileName, "w", encoding="utf-8") as f:
+                f.write(utils.to_json(self._entries))
+            os.replace(tmpFileName, self.fileName)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _signature(filePath):
+        stat = os.stat(filePath)
+        return stat.st_mtime, stat.st_size
+
+    def info(self, filePath):
+        """
+        :return: the cached info dict of filePath, or None if filePath is
+                 not in the cache or has changed since it was cached.
+        """
+        entry = self._entries.get(filePath)
+        if entry is None:
+            return None
+        try:
+            mtime, size = self._signature(filePath)
+        except OSError:
+            return None
+        if entry["mtime"] != mtime or entry["size"] != size:
+            return None
+        return entry["info"]
+
+    def update(self, filePath, info):
+        """Stores info as the cached info of filePath."""
+        try:
+            mtime, size = self._signature(filePath)
+        except OSError:
+            return
+        self._entries[filePath] = {"mtime": mtime, "size": size,
+                                   "info": info}
+
+    def prune(self, filePaths):
+        """Removes the entries of the files that are not in filePaths."""
+        filePaths = set(filePaths)
+        for filePath in list(self._entries.keys()):
+            if filePath not in filePaths:
+                del self._entries[filePath]
+
+
+class CatalogueWorker(QtCore.QThread):
+    """Thread reading the info of simulation files with :func:`readInfo`
+    and emitting infoRead for each of them, or readFailed with the error if
+    the file cannot be read, e.g. because it is being written. Failures are
+    not meant to be cached, so that the file is read again next time.
+
+    The worker keeps itself alive until it has finished, so that it can be
+    abandoned without waiting for the file being read."""
+
+    infoRead = QtCore.pyqtSignal(str, dict)
+    readFailed = QtCore.pyqtSignal(str, str)
+
+    def __init__(self, filePaths, parent=None):
+        """Constructor for the CatalogueWorker class.
+
+        :param filePaths: list of the paths of the files to read
+        """
+        super().__init__(parent)
+        self._filePaths = list(filePaths)
+        _runningWorkers.add(self)
+        self.finished.connect(self.onFinished)
+
+    def run(self):
+        for filePath in self._filePaths:
+            if self.isInterruptionRequested():
+                return
+            try:
+                info = readInfo(filePath)
+            except (OSError, zipfile.BadZipFile, ValueError,
+                    utils.FormatException) as err:
+                self.readFailed.emit(filePath, str(err))
+            else:
+                self.infoRead.emit(filePath, info)
+
+    @QtCore.pyqtSlot()
+    def onFinished(self):
+        _runningWorkers.discard(self)
@@ -19,6 +19,8 @@
 #
 
 import copy
+import io
+import os
 import zipfile
 
 import simplejson as json
@@ -26,7 +28,7 @@ from Qt import QtCore, QtWidgets, Qt
 
 from ts2 import __FILE_FORMAT__
 from ts2 import simulation
-from ts2 import utils, trains
+from ts2 import utils, trains, binformat, catalogue
 from ts2.routing import position, route
 from ts2.scenery import abstract, placeitem, lineitem, platformitem, \
     invisiblelinkitem, enditem, pointsitem, textitem
@@ -37,29 +39,43 @@ from ts2.game import logger
 translate = QtWidgets.qApp.translate
 
 
-def json_hook(dct):
-    """Hook method for json.load()."""
-    if not dct.get('__type__'):
-        return dct
-    elif dct['__type__'] == "Simulation":
-        return Editor(dct['options'], dct['trackItems'], dct['routes'],
-                      dct['trainTypes'], dct['services'], dct['trains'],
-                      dct['messageLogger'])
-    else:
-        return simulation.json_hook(dct)
+typeRegistry = utils.TypeRegistry(utils.typeRegistry)
+"""Registry of the types loaded by the editor. It builds an
+:class:`~ts2.editor.editor.Editor` instead of a
+:class:`~ts2.simulation.Simulation`."""
+
+json_hook = typeRegistry.objectHook
+"""Hook method for json.load()."""
+
+PROGRESS_STEP = 500
+"""Number of services between two progress reports of the services import
+and export."""
 
 
 def load(editorWindow, jsonStream):
     """Loads the simulation from jsonStream and returns it as an Editor.
 
     The logic of loading is the following:
-    1. We create the graph of objects from json.load(). When initialized,
-    each object stores its JSON data.
+    1. We create the graph of objects section by section with
+    simulation.readSections(). When initialized, each object stores its JSON
+    data.
     2. When all the objects are created, we call the initialize() method of the
     simulation which calls in turn the initialize() method of each object.
     This method will create all the missing links between the object and the
     simulation (and other objects)."""
-    editor = json.load(jsonStream, object_hook=json_hook, encoding='utf-8')
+    editor = simulation.readSections(jsonStream, typeRegistry)
+    if not isinstance(editor, Editor):
+        raise utils.FormatException(
+            translate("simulation.load", "Loaded file is not a TS2 simulation")
+        )
+    editor.initialize(editorWindow)
+    return editor
+
+
+def loadBinary(editorWindow, binaryStream):
+    """Loads the simulation from binaryStream, which is in the
+    :mod:`~ts2.binformat` format, and returns it as an Editor."""
+    editor = binformat.loads(binaryStream.read(), typeRegistry)
     if not isinstance(editor, Editor):
         raise utils.FormatException(
             translate("simulation.load", "Loaded file is not a TS2 simulation")
@@ -68,6 +84,13 @@ def load(editorWindow, jsonStream):
     return editor
 
 
+def loadFile(editorWindow, fileName):
+    """Loads the simulation file fileName, whatever its format, and returns
+    it as an Editor. Delta saves are applied on top of their base
+    simulation, as in the game. See :func:`ts2.simulation.loadFile`."""
+    return simulation.loadFile(editorWindow, fileName, typeRegistry)
+
+
 class WhiteLineItem(QtWidgets.QGraphicsLineItem):
     """Shortcut class to make a white line item and add to scene"""
     def __init__(self, x1, y1, x2, y2, parent, scene):
@@ -398,94 +421,128 @@ class Editor(simulation.Simulation):
         self.setOption("version", __FILE_FORMAT__)
 
         if self.fileName.endswith(".ts2"):
+            compressType, level = utils.settings.archiveCompression()
             with zipfile.ZipFile(self.fileName, "w") as zipArchive:
+                catalogue.writeMetadata(zipArchive, self.metadata())
                 zipArchive.writestr("simulation.json",
                                     json.dumps(self, separators=(',', ':'),
                                                for_json=True, encoding='utf-8'),
-                                    compress_type=zipfile.ZIP_BZIP2)
+                                    compress_type=compressType,
+                                    compresslevel=level)
         else:
             with open(self.fileName, 'w') as f:
                 json.dump(self, f, separators=(', ', ': '), indent=4,
                           sort_keys=True, for_json=True, encoding='utf-8')
 
-    def exportServicesToFile(self, fileName):
+    def exportServicesToFile(self, fileName, progress=None):
         """Exports the services to the file with the given fileName in ts2
-        services CSV format"""
-        file = open(fileName, "w", encoding="utf-8")
-        file.write("serviceCode;description;nextServiceCode;autoReverse;")
-        file.write("plannedTrainType;")
-        file.write("places=>;placeCode;scheduledArrivalTime;")
-        file.write("scheduledDepartureTime;trackCode;mustStop\n")
-        for service in self.services.values():
-            file.write("\"%s\";" % service.serviceCode)
-            file.write("\"%s\";" % service.description)
-            file.write("\"%s\";" % service.nextServiceCode)
-            file.write("%s;" % service.autoReverse)
-            file.write("\"%s\";" % service.plannedTrainType)
-
-            file.write(";")
-            for line in service.lines:
-                file.write("\"%s\";" % line.placeCode)
-                file.write("%s;" % line.scheduledArrivalTimeStr)
-                file.write("%s;" % line.scheduledDepartureTimeStr)
-                file.write("\"%s\";" % line.trackCode)
-                file.write("%s;" % line.mustStop)
-            file.write("\n")
-        file.close()
-
-    def importServicesFromFile(self, fileName):
+        services CSV format.
+
+        :param str fileName: Path of the CSV file to write
+        :param progress: Callable called as ``progress(done, total)`` every
+                         PROGRESS_STEP services, or None.
+        """
+        total = len(self.services)
+        with open(fileName, "w", encoding="utf-8") as file:
+            file.write("serviceCode;description;nextServiceCode;autoReverse;"
+                       "plannedTrainType;places=>;placeCode;"
+                       "scheduledArrivalTime;scheduledDepartureTime;"
+                       "trackCode;mustStop\n")
+            for done, service in enumerate(self.services.values()):
+                fields = [
+                    "\"%s\"" % service.serviceCode,
+                    "\"%s\"" % service.description,
+                    "\"%s\"" % service.nextServiceCode,
+                    "%s" % service.autoReverse,
+                    "\"%s\"" % service.plannedTrainType,
+                    ""
+                ]
+                for line in service.lines:
+                    fields.extend([
+                        "\"%s\"" % line.placeCode,
+                        line.scheduledArrivalTimeStr,
+                        line.scheduledDepartureTimeStr,
+                        "\"%s\"" % line.trackCode,
+                        "%s" % line.mustStop
+                    ])
+                file.write(";".join(fields) + ";\n")
+                if progress is not None and done % PROGRESS_STEP == 0:
+                    progress(done, total)
+        if progress is not None:
+            progress(total, total)
+
+    def importServicesFromFile(self, fileName, progress=None):
         """Imports the services from the ts2 formatted CSV file given by
-        fileName, deleting any previous service in the editor if any."""
-        self._services = {}
+        fileName, deleting any previous service in the editor if any.
+
+        The file is read line by line and the services are built directly.
+        The services model is reset once, when the import is complete.
+
+        :param str fileName: Path of the CSV file to read
+        :param progress: Callable called as ``progress(done, total)``, in
+                         bytes read, every PROGRESS_STEP services, or None.
+        """
         allowedHeaders = [
             "serviceCode", "description", "nextServiceCode", "autoReverse",
             "plannedTrainType", "places=>", "placeCode", "scheduledArrivalTime",
             "scheduledDepartureTime", "trackCode", "mustStop"
         ]
-        file = open(fileName, "r", encoding="utf-8")
-        headers = file.readline().split(";")
-        headers = [h.strip('" \n') for h in headers]
-        lineHeaders = []
-        placesIndex = 0
-        inPlaces = False
-        for header in headers:
-            # We have empty headers over service line columns
-            if header != "":
-                if header not in allowedHeaders:
-                    raise Exception(self.tr(
-                        "Format Error: invalid header %s detected") % header)
-                if header == "places=>":
-                    inPlaces = True
-                    placesIndex = headers.index(header)
-                    continue
-                if inPlaces:
-                    lineHeaders.append(header)
-
-        for line in file.readlines():
-            params = line.split(";")
-            if len(params) > 1:
-                params = [p.strip('" \n') for p in params]
-                serviceParameters = dict(zip(headers[:placesIndex],
-                                             params[:placesIndex]))
-                serviceParameters["__type__"] = "Service"
+        total = os.path.getsize(fileName)
+        self._servicesModel.beginResetModel()
+        self._services = {}
+        try:
+            with open(fileName, "rb") as rawFile:
+                file = io.TextIOWrapper(rawFile, encoding="utf-8")
+                headers = file.readline().split(";")
+                headers = [h.strip('" \n') for h in headers]
+                lineHeaders = []
+                placesIndex = 0
+                inPlaces = False
+                for header in headers:
+                    # We have empty headers over service line columns
+                    if header != "":
+                        if header not in allowedHeaders:
+                            raise Exception(self.tr(
+                                "Format Error: invalid header %s detected")
+                                % header)
+                        if header == "places=>":
+                            inPlaces = True
+                            placesIndex = headers.index(header)
+                            continue
+                        if inPlaces:
+                            lineHeaders.append(header)
+                serviceHeaders = headers[:placesIndex]
                 lineLength = len(lineHeaders)
-                serviceLines = []
-                for i in range((len(params) - placesIndex - 1) // lineLength):
-                    startIndex = placesIndex + 1 + i * lineLength
-                    endIndex = startIndex + lineLength + 1
-                    lineParameters = dict(zip(lineHeaders,
-                                              params[startIndex:endIndex]))
-                    lineParameters["__type__"] = "ServiceLine"
-                    if lineParameters["placeCode"]:
-                        serviceLines.append(lineParameters)
-                serviceParameters["lines"] = serviceLines
-                serviceCode = serviceParameters["serviceCode"]
-                jsonStr = json.dumps(serviceParameters, encoding='utf-8')
-                self.services[serviceCode] = json.loads(
-                    jsonStr, object_hook=json_hook, encoding='utf-8'
-                )
-                self.services[serviceCode].initialize(self)
-        file.close()
+
+                for count, line in enumerate(file):
+                    params = line.split(";")
+                    if len(params) <= 1:
+                        continue
+                    params = [p.strip('" \n') for p in params]
+                    serviceParameters = dict(zip(serviceHeaders,
+                                                 params[:placesIndex]))
+                    serviceLines = []
+                    for startIndex in range(placesIndex + 1,
+                                            len(params) - lineLength + 1,
+                                            lineLength):
+                        lineParameters = dict(zip(
+                            lineHeaders,
+                            params[startIndex:startIndex + lineLength]
+                        ))
+                        if lineParameters["placeCode"]:
+                            serviceLines.append(
+                                trains.ServiceLine(lineParameters)
+                            )
+                    serviceParameters["lines"] = serviceLines
+                    service = trains.Service(serviceParameters)
+                    self._services[service.serviceCode] = service
+                    service.initialize(self)
+                    if progress is not None and count % PROGRESS_STEP == 0:
+                        progress(rawFile.tell(), total)
+        finally:
+            self._servicesModel.endResetModel()
+        if progress is not None:
+            progress(total, total)
 
     def registerGraphicsItem(self, graphicItem):
         """Adds the graphicItem to the scene or to the libraryScene.
@@ -596,7 +653,10 @@ class Editor(simulation.Simulation):
     def deleteTrackItem(self, tiId):
         """Delete the TrackItem given by tiId."""
         tiId = int(tiId)
-        self._trackItems[tiId].removeAllGraphicsItems()
+        trackItem = self._trackItems[tiId]
+        trackItem.removeAllGraphicsItems()
+        if isinstance(trackItem, lineitem.LineItem):
+            self.unindexLineItem(trackItem)
         del self._trackItems[tiId]
 
     def deleteTrackItemLinks(self):
@@ -1020,3 +1080,11 @@ class Editor(simulation.Simulation):
         for ti in self.selectedItems.copy():
             self.removeItemFromSelection(ti)
             self.deleteTrackItem(ti.tiId)
+
+
+typeRegistry.registerFactory(
+    "Simulation",
+    lambda dct: Editor(dct['options'], dct['trackItems'], dct['routes'],
+                       dct['trainTypes'], dct['services'], dct['trains'],
+                       dct['messageLogger'])
+)
@@ -18,8 +18,6 @@
 #   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
 #
 
-import zipfile
-
 from Qt import QtGui, QtCore, QtWidgets, Qt
 
 from ts2 import scenery, utils
@@ -633,8 +631,9 @@ class EditorWindow(QtWidgets.QMainWindow):
                 self,
                 self.tr("Open a simulation"),
                 QtCore.QDir.currentPath(),
-                self.tr("TS2 files (*.ts2 *.json);;"
+                self.tr("TS2 files (*.ts2 *.tsg *.json);;"
                         "TS2 simulation files (*.ts2);;"
+                        "TS2 game files (*.tsg);;"
                         "JSON simulation files (*.json)"))
 
         if fileName:
@@ -646,16 +645,8 @@ class EditorWindow(QtWidgets.QMainWindow):
                 self.simulationDisconnect()
                 self.editor = None
 
-            # TODO: This is same code used elsewhere
-            # maybe there is a clever way to share this in utils or alike
             try:
-                if zipfile.is_zipfile(fileName):
-                    with zipfile.ZipFile(fileName) as zipArchive:
-                        with zipArchive.open("simulation.json") as file:
-                            self.editor = editor.load(self, file)
-                else:
-                    with open(fileName) as file:
-                        self.editor = editor.load(self, file)
+                self.editor = editor.loadFile(self, fileName)
             except (utils.FormatException,
                     utils.MissingDependencyException) as err:
                 QtWidgets.QMessageBox.critical(
@@ -1049,8 +1040,14 @@ class EditorWindow(QtWidgets.QMainWindow):
                 QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
             ) == QtWidgets.QMessageBox.Yes:
                 QtWidgets.qApp.setOverrideCursor(Qt.WaitCursor)
-                self.editor.importServicesFromFile(fileName)
-                QtWidgets.qApp.restoreOverrideCursor()
+                progressDialog, progress = self.createProgressDialog(
+                    self.tr("Importing services...")
+                )
+                try:
+                    self.editor.importServicesFromFile(fileName, progress)
+                finally:
+                    progressDialog.close()
+                    QtWidgets.qApp.restoreOverrideCursor()
 
     @QtCore.pyqtSlot()
     def exportServicesBtnClicked(self):
@@ -1064,7 +1061,32 @@ class EditorWindow(QtWidgets.QMainWindow):
             self.tr("CSV files (*.csv)")
         )
         if fileName:
-            self.editor.exportServicesToFile(fileName)
+            progressDialog, progress = self.createProgressDialog(
+                self.tr("Exporting services...")
+            )
+            try:
+                self.editor.exportServicesToFile(fileName, progress)
+            finally:
+                progressDialog.close()
+
+    def createProgressDialog(self, labelText):
+        """Creates a modal progress dialog without cancel button.
+
+        :param str labelText: Text of the dialog
+        :return: a tuple (dialog, progress) where progress is a callable
+                 taking (done, total) which updates the dialog.
+        """
+        progressDialog = QtWidgets.QProgressDialog(labelText, None, 0, 0,
+                                                   self)
+        progressDialog.setWindowModality(Qt.WindowModal)
+        progressDialog.setMinimumDuration(500)
+
+        def progress(done, total):
+            progressDialog.setMaximum(total)
+            progressDialog.setValue(done)
+            QtWidgets.qApp.processEvents()
+
+        return progressDialog, progress
 
     @QtCore.pyqtSlot()
     def setupTrainsBtnClicked(self):
@@ -0,0 +1,219 @@
+#
+#   Copyright (C) 2008-2015 by Nicolas Piganeau
+#   npi@m4x.org
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 2 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program; if not, write to the
+#   Free Software Foundation, Inc.,
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+
+"""Typed event stream of a game, for analysis.
+
+Events are recorded by an :class:`EventRecorder` into a columnar binary file
+made of a header followed by blocks. All numbers are little endian.
+
+- Header: ``MAGIC``, then the format version as uint16.
+- Places block: ``b"P"``, uint32 count, then for each new place name an
+  uint32 length followed by the UTF-8 bytes. Place indexes continue from one
+  places block to the next.
+- Events block: ``b"E"``, uint32 count, then one packed array per column, in
+  the order of ``COLUMNS``. Each array is preceded by zero bytes so that
+  its offset in the file is a multiple of its item size (since version 2).
+
+As the columns are aligned, those of a file mapped in memory or read into
+an aligned buffer can be loaded without copy with e.g.
+``numpy.frombuffer(data, dtype="<f8", count=count, offset=offset)``;
+:func:`readEvents` returns all the columns as ``array.array`` objects.
+"""
+
+import array
+import struct
+import sys
+
+from Qt import QtWidgets
+
+from ts2 import utils
+
+translate = QtWidgets.qApp.translate
+
+MAGIC = b"TS2E"
+VERSION = 2
+
+BLOCK_SIZE = 4096
+"""Number of events buffered in memory before being written."""
+
+
+class EventType:
+    """Types of the recorded events."""
+
+    ENTERED = 1
+    """A train entered the area. value1 is its initial delay in seconds."""
+
+    ARRIVED = 2
+    """A train arrived at a station. value1 is its delay in seconds, value2
+    is 1 if it arrived on a wrong platform, 0 otherwise."""
+
+    EXITED = 3
+    """A train exited the area. value1 is 1 if it was badly routed, 0
+    otherwise."""
+
+
+COLUMNS = (
+    ("eventType", "B"),
+    ("time", "d"),
+    ("trainId", "i"),
+    ("place", "i"),
+    ("value1", "d"),
+    ("value2", "d")
+)
+"""Name and ``array`` type code of the columns of the events blocks. time is
+the simulation time in seconds, place the index of the place name."""
+
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def _padding(pos, itemSize):
+    """
+    :return: the number of bytes to skip from pos to the next offset which
+             is a multiple of itemSize.
+    """
+    return -pos % itemSize
+
+
+class EventRecorder:
+    """Records typed events of a game into a columnar file.
+
+    Events are appended to in memory columns and written by blocks of
+    BLOCK_SIZE events, so that recording an event only costs a few array
+    appends."""
+
+    def __init__(self, fileName, blockSize=BLOCK_SIZE):
+        """Constructor for the EventRecorder class.
+
+        :param str fileName: Path of the file to write. It is overwritten.
+        :param int blockSize: Number of events written at a time
+        """
+        self.fileName = fileName
+        self._file = open(fileName, "wb")
+        self._file.write(MAGIC + _U16.pack(VERSION))
+        self._blockSize = blockSize
+        self._places = {}
+        self._newPlaces = []
+        self._columns = [array.array(typeCode) for _, typeCode in COLUMNS]
+
+    def record(self, eventType, time, trainId, place="",
+               value1=float("nan"), value2=float("nan")):
+        """Records an event.
+
+        :param int eventType: One of the :class:`EventType` values
+        :param float time: Simulation time in seconds
+        :param int trainId: Id of the train
+        :param str place: Code of the place, or an empty string
+        :param float value1: First value, depending on eventType
+        :param float value2: Second value, depending on eventType
+        """
+        placeIndex = self._places.get(place)
+        if placeIndex is None:
+            placeIndex = len(self._places)
+            self._places[place] = placeIndex
+            self._newPlaces.append(place)
+        eventTypes, times, trainIds, places, values1, values2 = self._columns
+        eventTypes.append(eventType)
+        times.append(time)
+        trainIds.append(trainId)
+        places.append(placeIndex)
+        values1.append(value1)
+        values2.append(value2)
+        if len(eventTypes) >= self._blockSize:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered events to the file."""
+        if self._newPlaces:
+            encoded = [place.encode("utf-8") for place in self._newPlaces]
+            self._file.write(b"P" + _U32.pack(len(encoded)))
+            for data in encoded:
+                self._file.write(_U32.pack(len(data)) + data)
+            self._newPlaces = []
+        count = len(self._columns[0])
+        if count:
+            self._file.write(b"E" + _U32.pack(count))
+            for column in self._columns:
+                if _BIG_ENDIAN:
+                    column.byteswap()
+                padding = _padding(self._file.tell(), column.itemsize)
+                self._file.write(bytes(padding) + column.tobytes())
+            self._columns = [array.array(typeCode)
+                             for _, typeCode in COLUMNS]
+        self._file.flush()
+
+    def close(self):
+        """Writes the buffered events and closes the file."""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+def readEvents(fileName):
+    """Reads a file written by an :class:`EventRecorder`.
+
+    :param str fileName: Path of the events file
+    :return: a tuple (columns, places) where columns is a dict mapping the
+             names of COLUMNS to ``array.array`` objects and places is the
+             list of place names indexed by the place column.
+    """
+    with open(fileName, "rb") as file:
+        data = file.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise utils.FormatException(
+            translate("events", "Not a TS2 events file")
+        )
+    pos = len(MAGIC)
+    version = _U16.unpack_from(data, pos)[0]
+    if version > VERSION:
+        raise utils.FormatException(
+            translate("events", "Unsupported events file version %i")
+            % version
+        )
+    pos += _U16.size
+    columns = {name: array.array(typeCode) for name, typeCode in COLUMNS}
+    places = []
+    while pos < len(data):
+        kind = data[pos:pos + 1]
+        count = _U32.unpack_from(data, pos + 1)[0]
+        pos += 1 + _U32.size
+        if kind == b"P":
+            for _ in range(count):
+                length = _U32.unpack_from(data, pos)[0]
+                pos += _U32.size
+                places.append(data[pos:pos + length].decode("utf-8"))
+                pos += length
+        elif kind == b"E":
+            for name, typeCode in COLUMNS:
+                column = array.array(typeCode)
+                if version >= 2:
+                    pos += _padding(pos, column.itemsize)
+                size = column.itemsize * count
+                column.frombytes(data[pos:pos + size])
+                if _BIG_ENDIAN:
+                    column.byteswap()
+                columns[name].extend(column)
+                pos += size
+        else:
+            raise utils.FormatException(
+                translate("events", "Corrupted events file")
+            )
+    return columns, places
@@ -18,10 +18,18 @@
 #   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
 #
 
+import collections
+import io
+import itertools
+import tempfile
+import zlib
+
 from Qt import QtCore, QtGui, Qt
 from ts2 import utils
+from ts2.utils import settings
 
 
+@utils.typeRegistry.register
 class Message(QtCore.QObject):
     """A Message instance holds all the data regarding one message emitted to
     the Message Logger of the simulation."""
@@ -53,16 +61,95 @@ class Message(QtCore.QObject):
         }
 
 
+PAGE_SIZE = 200
+"""Number of messages spilled to disk, and paged back in, at a time."""
+
+PAGE_CACHE_SIZE = 4
+"""Number of spilled pages kept in memory by the message logger."""
+
+
+class MessageSpill:
+    """Append-only, compressed file of the messages evicted from the
+    :class:`MessageLogger`.
+
+    Messages are written by pages of PAGE_SIZE messages, each page being a
+    zlib compressed JSON list of ``[msgType, msgText]`` pairs. Only the
+    offsets of the pages are kept in memory, and recently read pages are
+    cached. The file is a temporary file, deleted when closed.
+    """
+
+    def __init__(self):
+        """Constructor for the MessageSpill class."""
+        self._file = tempfile.TemporaryFile(prefix="ts2-messages-")
+        self._pages = []
+        self._cache = collections.OrderedDict()
+
+    def __len__(self):
+        """Returns the number of messages in the spill file."""
+        return len(self._pages) * PAGE_SIZE
+
+    def appendPage(self, messages):
+        """Appends a page of PAGE_SIZE messages to the file.
+
+        :param messages: list of (msgType, msgText) tuples
+        """
+        data = zlib.compress(utils.to_json(messages).encode("utf-8"))
+        self._file.seek(0, io.SEEK_END)
+        self._pages.append((self._file.tell(), len(data)))
+        self._file.write(data)
+
+    def message(self, index):
+        """Returns the (msgType, msgText) tuple of the message at index,
+        reading its page from the file if it is not cached."""
+        pageIndex, row = divmod(index, PAGE_SIZE)
+        page = self._cache.get(pageIndex)
+        if page is None:
+            offset, length = self._pages[pageIndex]
+            self._file.seek(offset)
+            page = utils.from_json(
+                zlib.decompress(self._file.read(length)).decode("utf-8")
+            )
+            self._cache[pageIndex] = page
+            if len(self._cache) > PAGE_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(pageIndex)
+        return tuple(page[row])
+
+    def close(self):
+        """Closes and deletes the spill file."""
+        self._file.close()
+        self._pages = []
+        self._cache.clear()
+
+
+@utils.typeRegistry.register
 class MessageLogger(QtCore.QAbstractTableModel):
-    """A MessageLogger holds all messages that has been emitted to it and
-    format them so that it can be used directly as a model for views."""
+    """A MessageLogger holds the messages that have been emitted to it and
+    format them so that it can be used directly as a model for views.
+
+    Only the last messages, up to the logger capacity setting, are held in
+    memory and saved. Older messages are either discarded or, if the spill
+    setting is on, spilled to a :class:`MessageSpill` file, from which they
+    are read back only when a view displays them. The last row of the model
+    is always an empty message."""
 
     def __init__(self, parameters):
         """Constructor for the MessageLogger class."""
         super().__init__()
-        self._messages = parameters.get('messages', []) + [Message(
+        self.capacity = max(PAGE_SIZE, settings.i(
+            settings.LOGGER_CAPACITY, settings.DEFAULT_LOGGER_CAPACITY
+        ))
+        self.spill = settings.b(settings.LOGGER_SPILL,
+                                settings.DEFAULT_LOGGER_SPILL)
+        self._spill = None
+        self._messages = collections.deque()
+        for message in parameters.get('messages', []):
+            self._messages.append(message)
+            self.evict()
+        self._lastMessage = Message(
             {'msgType': Message.SIMULATION_MSG, 'msgText': " "}
-        )]
+        )
         self.simulation = None
 
     def initialize(self, simulation):
@@ -70,33 +157,83 @@ class MessageLogger(QtCore.QAbstractTableModel):
         self.simulation = simulation
 
     def for_json(self):
-        """Dumps the messages to JSON."""
+        """Dumps the messages held in memory to JSON."""
         messages = []
         if self.simulation.context == utils.Context.GAME:
-            messages = self._messages
+            messages = list(self._messages)
         return {
             "__type__": "MessageLogger",
             "messages": messages
         }
 
+    @property
+    def spilledCount(self):
+        """Returns the number of messages spilled to disk."""
+        if self._spill is None:
+            return 0
+        return len(self._spill)
+
+    def evict(self):
+        """Removes the oldest messages from memory if there are more than
+        the capacity. They are spilled by pages if the spill setting is
+        on, or else discarded. The spill file is created on the first
+        eviction."""
+        if len(self._messages) <= self.capacity:
+            return
+        if self.spill:
+            if self._spill is None:
+                self._spill = MessageSpill()
+            page = [(msg.msgType, msg.msgText)
+                    for msg in itertools.islice(self._messages, PAGE_SIZE)]
+            self._spill.appendPage(page)
+            for _ in range(PAGE_SIZE):
+                self._messages.popleft()
+        else:
+            self.beginRemoveRows(QtCore.QModelIndex(), 0, 0)
+            self._messages.popleft()
+            self.endRemoveRows()
+
+    def close(self):
+        """Closes the spill file, if any, discarding the spilled messages.
+        """
+        if self._spill is not None:
+            self.beginResetModel()
+            self._spill.close()
+            self._spill = None
+            self.endResetModel()
+
     def addMessage(self, msgText, msgType=Message.SIMULATION_MSG):
         """Adds a message to the logger."""
-        row = len(self._messages) - 1
+        row = self.rowCount() - 1
         if msgType == Message.SIMULATION_MSG:
-            msgText = \
-                self.simulation.currentTime.toString("HH:mm - ") + msgText
+            msgText = utils.timeToString(self.simulation.currentTime,
+                                         withSeconds=False) + " - " + msgText
         msgData = {
             'msgType': msgType,
             'msgText': msgText
         }
         self.beginInsertRows(QtCore.QModelIndex(), row, row)
-        self._messages.insert(row, Message(msgData))
+        self._messages.append(Message(msgData))
         self.endInsertRows()
+        self.evict()
+
+    def message(self, row):
+        """
+        :return: the (msgType, msgText) tuple of the message at row
+        """
+        spilled = self.spilledCount
+        if row < spilled:
+            return self._spill.message(row)
+        if row - spilled < len(self._messages):
+            message = self._messages[row - spilled]
+        else:
+            message = self._lastMessage
+        return message.msgType, message.msgText
 
     def rowCount(self, parent=None, *args, **kwargs):
         """Returns the number of rows of the model, corresponding to the
         number of messages in the logger."""
-        return len(self._messages)
+        return self.spilledCount + len(self._messages) + 1
 
     def columnCount(self, parent=None, *args, **kwargs):
         """Returns the number of columns of the model"""
@@ -105,13 +242,13 @@ class MessageLogger(QtCore.QAbstractTableModel):
     def data(self, index, role=Qt.DisplayRole):
         """Returns the data at the given index"""
         if role == Qt.DisplayRole:
-            return str(self._messages[index.row()])
+            return self.message(index.row())[1]
         elif role == Qt.FontRole:
             return QtGui.QFont("Courier new")
         elif role == Qt.BackgroundRole:
             return QtGui.QBrush(Qt.black)
         elif role == Qt.ForegroundRole:
-            msgType = self._messages[index.row()].msgType
+            msgType = self.message(index.row())[0]
             if msgType == Message.SOFTWARE_MSG:
                 return QtGui.QBrush(Qt.magenta)
             elif msgType == Message.PLAYER_WARNING_MSG:
@@ -0,0 +1,106 @@
+#
+#   Copyright (C) 2008-2015 by Nicolas Piganeau
+#   npi@m4x.org
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 2 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program; if not, write to the
+#   Free Software Foundation, Inc.,
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+
+from Qt import QtCore
+
+from ts2.utils import settings
+
+
+class ModelNotifier(QtCore.QObject):
+    """Batches the dataChanged notifications of the game models.
+
+    Models report their changed cells with :meth:`cellsChanged` instead of
+    emitting dataChanged themselves. The changed columns of each row are
+    merged, and a dataChanged is emitted for each run of consecutive rows
+    with the same changed columns, so that rows which have not changed are
+    not notified, e.g. to a sorting proxy model. Notifications are emitted
+    at most once per frame, i.e. at most UI_REFRESH_RATE times per second
+    whatever the number of changes and the speed of the simulation."""
+
+    def __init__(self, parent=None):
+        """Constructor for the ModelNotifier class."""
+        super().__init__(parent)
+        self._rows = {}
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.flush)
+        self.setRefreshRate(settings.i(settings.UI_REFRESH_RATE,
+                                       settings.DEFAULT_UI_REFRESH_RATE))
+
+    def setRefreshRate(self, rate):
+        """Sets the maximum number of notifications per second per model."""
+        self._timer.setInterval(round(1000 / max(1, rate)))
+
+    def cellsChanged(self, model, top, left, bottom=None, right=None):
+        """Reports that the cells of model from (top, left) to
+        (bottom, right) have changed. They are notified at the next frame.
+        """
+        if bottom is None:
+            bottom = top
+        if right is None:
+            right = left
+        rows = self._rows.setdefault(model, {})
+        for row in range(top, bottom + 1):
+            columns = rows.get(row)
+            if columns is None:
+                rows[row] = (left, right)
+            else:
+                rows[row] = (min(columns[0], left), max(columns[1], right))
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def rowChanged(self, model, row):
+        """Reports that all the cells of the given row of model have
+        changed."""
+        self.cellsChanged(model, row, 0, row, model.columnCount() - 1)
+
+    @QtCore.pyqtSlot()
+    def flush(self):
+        """Emits the pending notifications now."""
+        pending = self._rows
+        self._rows = {}
+        self._timer.stop()
+        for model, rows in pending.items():
+            lastRow = model.rowCount() - 1
+            lastColumn = model.columnCount() - 1
+            run = None
+            for row in sorted(rows):
+                if row > lastRow:
+                    break
+                left, right = rows[row]
+                right = min(right, lastColumn)
+                if left > right:
+                    continue
+                if run is not None and row == run[1] + 1 and \
+                        (left, right) == (run[2], run[3]):
+                    run[1] = row
+                else:
+                    self._emit(model, run)
+                    run = [row, row, left, right]
+            self._emit(model, run)
+
+    @staticmethod
+    def _emit(model, run):
+        """Emits dataChanged for run, i.e. [top, bottom, left, right], of
+        model if it is not None."""
+        if run is not None:
+            top, bottom, left, right = run
+            model.dataChanged.emit(model.index(top, left),
+                                   model.index(bottom, right))
@@ -0,0 +1,268 @@
+#
+#   Copyright (C) 2008-2015 by Nicolas Piganeau
+#   npi@m4x.org
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 2 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program; if not, write to the
+#   Free Software Foundation, Inc.,
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+
+import os
+import tempfile
+import zipfile
+
+from Qt import QtCore
+
+from ts2 import binformat, catalogue
+from ts2.utils import settings
+
+AUTOSAVE_DIR = "autosave"
+"""Name of the directory of the checkpoints in the user data directory"""
+
+AUTOSAVE_FILE = "autosave-%i.tsg"
+"""File name pattern of the checkpoints"""
+
+AUTOSAVE_COMPRESSION = (zipfile.ZIP_DEFLATED, 1)
+"""Compression of the checkpoints, which are written often and seldom
+read, so that the fastest compression is preferred."""
+
+_runningWorkers = set()
+
+
+def writeArchive(fileName, metadata, payload, compressType, level):
+    """Writes a .ts2 archive atomically.
+
+    The archive is written to a temporary file in the same directory, which
+    is renamed to fileName once complete, so that fileName is never left
+    half written.
+
+    :param str fileName: Path of the archive to write
+    :param dict metadata: Metadata written as the metadata member
+    :param bytes payload: The simulation in the :mod:`~ts2.binformat` format
+    :param compressType: zipfile compression type of the payload
+    :param level: compression level of the payload, or None
+    """
+    directory = os.path.dirname(os.path.abspath(fileName))
+    fd, tmpFileName = tempfile.mkstemp(suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as tmpFile:
+            with zipfile.ZipFile(tmpFile, "w") as zipArchive:
+                catalogue.writeMetadata(zipArchive, metadata)
+                zipArchive.writestr(binformat.MEMBER_NAME, payload,
+                                    compress_type=compressType,
+                                    compresslevel=level)
+        os.replace(tmpFileName, fileName)
+    except BaseException:
+        try:
+            os.remove(tmpFileName)
+        except OSError:
+            pass
+        raise
+
+
+def waitForWorkers():
+    """Blocks until all running save workers have finished. To be called
+    before the application exits."""
+    for worker in list(_runningWorkers):
+        worker.wait()
+
+
+class SaveWorker(QtCore.QThread):
+    """Thread encoding, compressing and writing a simulation state captured
+    with :meth:`~ts2.simulation.Simulation.captureState`.
+
+    The state may be made of the captured mutable sections of the
+    simulation only, in which case its static sections are given apart, as
+    returned by :meth:`~ts2.simulation.Simulation.staticState`. Those which
+    are not encoded yet are encoded by the worker into a dict of its own
+    and sent back with staticEncoded, so that the next saves can reuse them
+    without encoding the scenery again.
+
+    The worker keeps itself alive until it has finished, so that callers do
+    not need to hold a reference to it."""
+
+    saved = QtCore.pyqtSignal(str)
+    failed = QtCore.pyqtSignal(str, str)
+    staticEncoded = QtCore.pyqtSignal(object)
+    """pyqtSignal(dict) with the static sections, as
+    :class:`~ts2.binformat.Encoded` values"""
+
+    def __init__(self, fileName, state, metadata, compressType, level,
+                 static=None):
+        """Constructor for the SaveWorker class.
+
+        :param str fileName: Path of the archive to write
+        :param dict state: Captured state of the simulation
+        :param dict metadata: Metadata of the simulation
+        :param compressType: zipfile compression type
+        :param level: compression level, or None
+        :param dict static: Captured, or already encoded, static sections
+                            to add to state, or None. It is not modified.
+        """
+        super().__init__()
+        self.fileName = fileName
+        self._state = state
+        self._static = static
+        self._metadata = metadata
+        self._compressType = compressType
+        self._level = level
+        _runningWorkers.add(self)
+        self.finished.connect(self.onFinished)
+
+    def encode(self):
+        """Returns the payload of the archive, i.e. the captured state
+        encoded in the :mod:`~ts2.binformat` format."""
+        if self._static is None:
+            return binformat.dumps(self._state)
+        encoded = {}
+        for key, value in self._static.items():
+            if not isinstance(value, binformat.Encoded):
+                value = binformat.Encoded(binformat.dumps(value))
+            encoded[key] = value
+        if any(encoded[key] is not self._static[key] for key in encoded):
+            self.staticEncoded.emit(encoded)
+        state = dict(self._state)
+        state.update(encoded)
+        return binformat.dumps(state)
+
+    def run(self):
+        try:
+            payload = self.encode()
+            writeArchive(self.fileName, self._metadata, payload,
+                         self._compressType, self._level)
+        except Exception as err:
+            self.failed.emit(self.fileName, str(err))
+        else:
+            self.saved.emit(self.fileName)
+
+    @QtCore.pyqtSlot()
+    def onFinished(self):
+        self._state = None
+        self._static = None
+        _runningWorkers.discard(self)
+
+
+class Autosaver(QtCore.QObject):
+    """Writes rotating checkpoints of a running game in the autosave
+    directory of the user data directory.
+
+    A checkpoint is written every interval of simulation time or of wall
+    clock time, according to the autosave settings, unless the simulation
+    time has not changed since the last one. In sim time, a checkpoint
+    falling due is taken once back in the event loop, so that it never
+    captures the simulation in the middle of a tick. Only the mutable
+    sections of the simulation are captured in the GUI thread; encoding and
+    writing are done by a :class:`SaveWorker`. At most one checkpoint is
+    written at a time: a checkpoint falling due while the previous one is
+    still being written is skipped.
+    """
+
+    checkpointSaved = QtCore.pyqtSignal(str)
+    checkpointFailed = QtCore.pyqtSignal(str, str)
+
+    def __init__(self, simulation, directory=None):
+        """Constructor for the Autosaver class.
+
+        :param simulation: The :class:`~ts2.simulation.Simulation` to save.
+                           It is the parent of the autosaver.
+        :param str directory: Directory of the checkpoints. Defaults to
+                              AUTOSAVE_DIR in the user data directory.
+        """
+        super().__init__(simulation)
+        self.simulation = simulation
+        if directory is None:
+            directory = os.path.join(settings.userDataDir, AUTOSAVE_DIR)
+        self.directory = directory
+        self.mode = settings.autosaveMode()
+        self.interval = 60 * max(1, settings.i(
+            settings.AUTOSAVE_INTERVAL, settings.DEFAULT_AUTOSAVE_INTERVAL
+        ))
+        self.count = max(1, settings.i(settings.AUTOSAVE_COUNT,
+                                       settings.DEFAULT_AUTOSAVE_COUNT))
+        self._worker = None
+        self._lastTime = simulation.currentTime
+        self._timer = QtCore.QTimer(self)
+        self._timer.timeout.connect(self.checkpoint)
+        self._dueTimer = QtCore.QTimer(self)
+        self._dueTimer.setSingleShot(True)
+        self._dueTimer.setInterval(0)
+        self._dueTimer.timeout.connect(self.checkpoint)
+        if self.mode == "wall":
+            self._timer.start(self.interval * 1000)
+        elif self.mode == "sim":
+            simulation.timeChanged.connect(self.onTimeChanged)
+
+    def fileNames(self):
+        """
+        :return: the paths of the checkpoint files, existing or not
+        """
+        return [os.path.join(self.directory, AUTOSAVE_FILE % i)
+                for i in range(1, self.count + 1)]
+
+    def nextFileName(self):
+        """
+        :return: the path of the checkpoint to write next, i.e. the first
+                 missing one or else the oldest one.
+        """
+        def mtime(fileName):
+            try:
+                return os.path.getmtime(fileName)
+            except OSError:
+                return -1
+        return min(self.fileNames(), key=mtime)
+
+    @QtCore.pyqtSlot(float)
+    def onTimeChanged(self, time):
+        if time - self._lastTime >= self.interval:
+            self._dueTimer.start()
+
+    @QtCore.pyqtSlot()
+    def checkpoint(self):
+        """Captures the mutable state of the simulation and starts writing
+        it to the next checkpoint file."""
+        currentTime = self.simulation.currentTime
+        if self._worker is not None or currentTime == self._lastTime:
+            return
+        self._lastTime = currentTime
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+        except OSError as err:
+            self.checkpointFailed.emit(self.directory, str(err))
+            return
+        compressType, level = AUTOSAVE_COMPRESSION
+        worker = SaveWorker(
+            self.nextFileName(),
+            self.simulation.captureState(self.simulation.MUTABLE_SECTIONS),
+            self.simulation.metadata(), compressType, level,
+            self.simulation.staticState()
+        )
+        worker.staticEncoded.connect(self.simulation.setStaticState)
+        worker.saved.connect(self.checkpointSaved)
+        worker.failed.connect(self.checkpointFailed)
+        worker.finished.connect(self.onWorkerFinished)
+        self._worker = worker
+        worker.start()
+
+    @QtCore.pyqtSlot()
+    def onWorkerFinished(self):
+        self._worker = None
+
+    def stop(self):
+        """Stops writing checkpoints. The checkpoint being written, if any,
+        is completed."""
+        self._timer.stop()
+        self._dueTimer.stop()
+        if self.mode == "sim":
+            self.simulation.timeChanged.disconnect(self.onTimeChanged)
+        self.mode = "off"
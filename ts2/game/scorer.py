@@ -20,6 +20,8 @@
 
 from Qt import QtCore
 
+from ts2.game import events
+
 
 class Scorer(QtCore.QObject):
     """A scorer calculates the score of the player during the simulation."""
@@ -92,7 +94,15 @@ class Scorer(QtCore.QObject):
             )
         scheduledArrivalTime = serviceLine.scheduledArrivalTime
         currentTime = self.simulation.currentTime
-        secondsLate = abs(scheduledArrivalTime.secsTo(currentTime))
+        if scheduledArrivalTime is not None:
+            delay = int(currentTime - scheduledArrivalTime)
+        else:
+            delay = 0
+        self.simulation.recordEvent(
+            events.EventType.ARRIVED, trainId, place.placeCode, delay,
+            float(actualPlatform != plannedPlatform)
+        )
+        secondsLate = abs(delay)
         if secondsLate // 60 > 0:
             minutesLateByPlayer = ((secondsLate // 60) -
                                    (train.initialDelay // 60))
@@ -113,6 +123,8 @@ class Scorer(QtCore.QObject):
     def trainExitedArea(self, trainId):
         """Updates the score when the train exits the area."""
         train = self.simulation.trains[trainId]
+        self.simulation.recordEvent(events.EventType.EXITED, trainId, "",
+                                    float(train.nextPlaceIndex is not None))
         if train.nextPlaceIndex is not None:
             self.score += self.wrongDestinationPenalty
             self.simulation.messageLogger.addMessage(
@@ -0,0 +1,208 @@
+#
+#   Copyright (C) 2008-2015 by Nicolas Piganeau
+#   npi@m4x.org
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 2 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program; if not, write to the
+#   Free Software Foundation, Inc.,
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+
+from Qt import QtCore, QtGui, QtWidgets, Qt
+
+from ts2.scenery import lineitem, invisiblelinkitem, pointsitem
+
+MINIMAP_REFRESH_INTERVAL = 1000
+"""Interval in milliseconds between two refreshes of the occupied items"""
+
+MARGIN = 20
+"""Margin in scene units around the track of the minimap"""
+
+
+def trackLines(trackItem):
+    """
+    :return: the lines, in scene coordinates, drawn on the minimap for
+             trackItem.
+    :rtype: ``list`` of ``QLineF``
+    """
+    if isinstance(trackItem, invisiblelinkitem.InvisibleLinkItem):
+        return []
+    if isinstance(trackItem, lineitem.LineItem):
+        return [trackItem.sceneLine]
+    if isinstance(trackItem, pointsitem.PointsItem):
+        return [QtCore.QLineF(trackItem.origin, trackItem.center),
+                QtCore.QLineF(trackItem.center, trackItem.end),
+                QtCore.QLineF(trackItem.center, trackItem.reverse)]
+    return []
+
+
+class MinimapWidget(QtWidgets.QWidget):
+    """Overview of the whole layout of a game, showing the track and the
+    items occupied by trains.
+
+    The minimap does not render the scene: the geometry of the line and
+    points items is read once and the track is drawn into a pixmap at the
+    size of the widget. Only the occupied items are drawn on top of it,
+    refreshed every MINIMAP_REFRESH_INTERVAL, together with the frame of
+    the part of the layout shown in the view. Clicking on the minimap
+    centers the view on the clicked point."""
+
+    def __init__(self, view, parent=None):
+        """Constructor for the MinimapWidget class.
+
+        :param view: The ``QGraphicsView`` of the scene, which is centered
+                     on click
+        :param parent: The parent widget
+        """
+        super().__init__(parent)
+        self.view = view
+        self.simulation = None
+        self.setMinimumSize(100, 75)
+        self.setCursor(Qt.PointingHandCursor)
+        self.setAutoFillBackground(True)
+        self.setPalette(QtGui.QPalette(Qt.black))
+        self.trackPen = QtGui.QPen(Qt.darkGray, 0)
+        self.occupiedPen = QtGui.QPen(Qt.red, 2)
+        self.occupiedPen.setCosmetic(True)
+        self.framePen = QtGui.QPen(Qt.yellow, 0)
+        self._items = []
+        self._occupied = []
+        self._sceneRect = QtCore.QRectF()
+        self._background = None
+        self._frame = QtCore.QRectF()
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(MINIMAP_REFRESH_INTERVAL)
+        self._timer.timeout.connect(self.refresh)
+        view.horizontalScrollBar().valueChanged.connect(self.updateFrame)
+        view.verticalScrollBar().valueChanged.connect(self.updateFrame)
+
+    def setSimulation(self, simulation):
+        """Sets the simulation shown by the minimap, or None."""
+        self.simulation = simulation
+        self._items = []
+        self._occupied = []
+        self._background = None
+        self._sceneRect = QtCore.QRectF()
+        if simulation is None:
+            self._timer.stop()
+        else:
+            for trackItem in simulation.trackItems.values():
+                lines = trackLines(trackItem)
+                if lines:
+                    self._items.append((trackItem, lines))
+                    for line in lines:
+                        self._sceneRect |= QtCore.QRectF(
+                            line.p1(), line.p2()
+                        ).normalized()
+            self._sceneRect.adjust(-MARGIN, -MARGIN, MARGIN, MARGIN)
+            self._timer.start()
+            self.refresh()
+        self.update()
+
+    def sceneTransform(self):
+        """
+        :return: the transform from the scene coordinates to the coordinates
+                 of the widget, fitting the layout in the widget.
+        :rtype: ``QTransform``
+        """
+        transform = QtGui.QTransform()
+        rect = self._sceneRect
+        if rect.isEmpty():
+            return transform
+        scale = min(self.width() / rect.width(),
+                    self.height() / rect.height())
+        transform.translate(
+            (self.width() - rect.width() * scale) / 2,
+            (self.height() - rect.height() * scale) / 2
+        )
+        transform.scale(scale, scale)
+        transform.translate(-rect.left(), -rect.top())
+        return transform
+
+    @QtCore.pyqtSlot()
+    def refresh(self):
+        """Reads the occupied items from the simulation and repaints the
+        minimap if they have changed."""
+        if self.simulation is None or not self.isVisible():
+            return
+        occupied = [lines for trackItem, lines in self._items
+                    if trackItem.trainPresent()]
+        if occupied != self._occupied:
+            self._occupied = occupied
+            self.update()
+        self.updateFrame()
+
+    @QtCore.pyqtSlot()
+    def updateFrame(self):
+        """Repaints the minimap if the part of the layout shown in the view
+        has changed."""
+        frame = QtCore.QRectF()
+        if self.simulation is not None:
+            frame = self.view.mapToScene(
+                self.view.viewport().rect()
+            ).boundingRect()
+        if frame != self._frame:
+            self._frame = frame
+            self.update()
+
+    def background(self):
+        """
+        :return: the track drawn at the size of the widget
+        :rtype: ``QPixmap``
+        """
+        ratio = self.devicePixelRatioF()
+        size = self.size() * ratio
+        if self._background is None or self._background.size() != size:
+            self._background = QtGui.QPixmap(size)
+            self._background.setDevicePixelRatio(ratio)
+            self._background.fill(Qt.transparent)
+            painter = QtGui.QPainter(self._background)
+            painter.setTransform(self.sceneTransform())
+            painter.setPen(self.trackPen)
+            for trackItem, lines in self._items:
+                painter.drawLines(lines)
+            painter.end()
+        return self._background
+
+    def paintEvent(self, event):
+        if self.simulation is None:
+            return
+        painter = QtGui.QPainter(self)
+        painter.drawPixmap(0, 0, self.background())
+        painter.setTransform(self.sceneTransform())
+        painter.setPen(self.occupiedPen)
+        for lines in self._occupied:
+            painter.drawLines(lines)
+        painter.setPen(self.framePen)
+        painter.drawRect(self._frame)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.centerView(event.pos())
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.LeftButton:
+            self.centerView(event.pos())
+
+    def centerView(self, pos):
+        """Centers the view on the point of the layout at pos in the
+        minimap."""
+        if self.simulation is None:
+            return
+        transform, invertible = self.sceneTransform().inverted()
+        if invertible:
+            self.view.centerOn(transform.map(QtCore.QPointF(pos)))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
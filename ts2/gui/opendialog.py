@@ -6,9 +6,10 @@ import fnmatch
 from urllib import request
 
 from Qt import QtCore, QtWidgets, Qt
-import json
+import simplejson as json
 
 import ts2
+from ts2 import catalogue
 from ts2.utils import settings
 from ts2.gui import widgets
 
@@ -130,6 +131,11 @@ class OpenDialog(QtWidgets.QDialog):
             self.onTreeBrowseItemDblClicked
         )
 
+        # Catalogue of the simulations dir
+        self.catalogue = catalogue.SimulationCatalogue()
+        self.catalogueWorker = None
+        self._simItems = {}
+
         # =================================
         # Bottom status
         self.statusBar = widgets.StatusBar()
@@ -177,10 +183,21 @@ class OpenDialog(QtWidgets.QDialog):
                         fName = os.path.join(settings.simulationsDir,
                                              fn.replace(".json", ".ts2"))
                         os.makedirs(os.path.dirname(fName), exist_ok=True)
+                        data = zipArchive.read(fileName)
+                        sim = json.loads(data.decode("utf-8"))
+                        compressType, level = settings.archiveCompression()
+                        metadata = catalogue.metadata(
+                            sim.get("options", {}),
+                            sim.get("trackItems", {}),
+                            sim.get("routes", {}),
+                            sim.get("services", {}),
+                            sim.get("trains", [])
+                        )
                         with zipfile.ZipFile(fName, "w") as ts2Zip:
-                            ts2Zip.writestr("simulation.json",
-                                            zipArchive.read(fileName),
-                                            compress_type=zipfile.ZIP_BZIP2)
+                            catalogue.writeMetadata(ts2Zip, metadata)
+                            ts2Zip.writestr("simulation.json", data,
+                                            compress_type=compressType,
+                                            compresslevel=level)
 
         QtWidgets.qApp.restoreOverrideCursor()
 
@@ -202,9 +219,14 @@ class OpenDialog(QtWidgets.QDialog):
         self.stackWidget.setCurrentIndex(idx)
 
     def onRefreshSims(self):
-        """Reloads the simulations dir"""
-        self.statusBar.showMessage("Loading")
+        """Reloads the simulations dir.
+
+        The tree is populated at once from the catalogue cache. Files that
+        are not in the cache or have changed are read in a background
+        worker, and their items are updated as they are read."""
+        self.stopCatalogueWorker()
         self.treeSims.clear()
+        self._simItems = {}
 
         ts2_files = {}
         for root, dirnames, filenames in os.walk(settings.simulationsDir):
@@ -214,29 +236,96 @@ class OpenDialog(QtWidgets.QDialog):
                     ts2_files[d] = []
                 ts2_files[d].append(os.path.join(root, filename))
 
+        staleFiles = []
         for folder in sorted(ts2_files.keys()):
             pitem = QtWidgets.QTreeWidgetItem()
             pitem.setText(C.name, folder)
             pitem.setFirstColumnSpanned(True)
             self.treeSims.addTopLevelItem(pitem)
             for file_path in ts2_files[folder]:
-                with zipfile.ZipFile(file_path, "r") as zippy:
-
-                    # wtf, confused why bytes returned
-                    bytesData = zippy.read("simulation.json")
-                    data = json.loads(bytesData.decode())
-                    nfo = data['options']
-
-                    item = QtWidgets.QTreeWidgetItem(pitem)
-                    item.setText(C.name, nfo['title'])
-                    item.setText(C.description, nfo['description'])
-                    item.setText(C.file_name, os.path.basename(file_path))
-                    item.setText(C.file_path, file_path)
+                item = QtWidgets.QTreeWidgetItem(pitem)
+                item.setText(C.file_name, os.path.basename(file_path))
+                item.setText(C.file_path, file_path)
+                self._simItems[file_path] = item
+                nfo = self.catalogue.info(file_path)
+                if nfo is None:
+                    item.setText(C.name, os.path.basename(file_path))
+                    staleFiles.append(file_path)
+                else:
+                    self.setSimItemInfo(item, nfo)
             pitem.setExpanded(True)
 
+        self.catalogue.prune(self._simItems.keys())
         self.treeSims.resizeColumnToContents(C.name)
+        if staleFiles:
+            self.statusBar.showMessage("Loading")
+            self.statusBar.showBusy(True)
+            self.catalogueWorker = catalogue.CatalogueWorker(staleFiles)
+            self.catalogueWorker.infoRead.connect(self.onCatalogueInfoRead)
+            self.catalogueWorker.readFailed.connect(
+                self.onCatalogueReadFailed
+            )
+            self.catalogueWorker.finished.connect(
+                self.onCatalogueWorkerFinished
+            )
+            self.catalogueWorker.start()
+        else:
+            self.catalogue.save()
+            self.statusBar.showMessage("")
+
+    @staticmethod
+    def setSimItemInfo(item, nfo):
+        item.setText(C.name, nfo['title'])
+        item.setText(C.description, nfo['description'])
+
+    @QtCore.pyqtSlot(str, dict)
+    def onCatalogueInfoRead(self, filePath, nfo):
+        """Updates the cache and the tree with the info read by the
+        catalogue worker."""
+        self.catalogue.update(filePath, nfo)
+        item = self._simItems.get(filePath)
+        if item is not None:
+            self.setSimItemInfo(item, nfo)
+
+    @QtCore.pyqtSlot(str, str)
+    def onCatalogueReadFailed(self, filePath, error):
+        """Shows the error of a file the catalogue worker could not read.
+        It is not cached, so that the file is read again at the next
+        refresh."""
+        item = self._simItems.get(filePath)
+        if item is not None:
+            item.setText(C.description, error)
+
+    @QtCore.pyqtSlot()
+    def onCatalogueWorkerFinished(self):
+        if self.sender() is not self.catalogueWorker:
+            return
+        self.catalogueWorker = None
+        self.catalogue.save()
+        self.treeSims.resizeColumnToContents(C.name)
+        self.statusBar.showBusy(False)
         self.statusBar.showMessage("")
 
+    def stopCatalogueWorker(self):
+        """Stops the catalogue worker if it is running, without waiting for
+        the file it is reading. The worker is disconnected from the dialog
+        and deleted once it has finished."""
+        if self.catalogueWorker is not None:
+            worker = self.catalogueWorker
+            self.catalogueWorker = None
+            worker.requestInterruption()
+            worker.infoRead.disconnect(self.onCatalogueInfoRead)
+            worker.readFailed.disconnect(self.onCatalogueReadFailed)
+            worker.finished.disconnect(self.onCatalogueWorkerFinished)
+            worker.finished.connect(worker.deleteLater)
+            self.statusBar.showBusy(False)
+
+    def done(self, result):
+        """Reimplemented from QDialog to stop the catalogue worker."""
+        self.stopCatalogueWorker()
+        self.catalogue.save()
+        super().done(result)
+
     def onRefreshRecent(self):
         """Reloads the recent items"""
         self.treeRecent.clear()
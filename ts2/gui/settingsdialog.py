@@ -66,6 +66,82 @@ class SettingsDialog(QtWidgets.QDialog):
         self.chkLoadLast.toggled.connect(self.onLoadLast)
         grid.addWidget(self.chkLoadLast, row, 1, 1, 1)
 
+        # ======================
+        # Saving Options
+        grp = QtWidgets.QGroupBox()
+        grp.setTitle(self.tr("Saving"))
+        grp.setFlat(True)
+        middleLayout.addWidget(grp)
+
+        grid = QtWidgets.QGridLayout()
+        grp.setLayout(grid)
+
+        # Compression codec
+        row = 0
+        grid.addWidget(QtWidgets.QLabel(self.tr("Compression")), row, 0, 1, 1,
+                       Qt.AlignRight)
+        self.cmbArchiveCodec = QtWidgets.QComboBox()
+        self.cmbArchiveCodec.addItems(list(settings.ARCHIVE_CODECS.keys()))
+        grid.addWidget(self.cmbArchiveCodec, row, 1, 1, 1)
+
+        # Compression level
+        row += 1
+        grid.addWidget(QtWidgets.QLabel(self.tr("Compression level")), row, 0,
+                       1, 1, Qt.AlignRight)
+        self.sbArchiveLevel = QtWidgets.QSpinBox()
+        self.sbArchiveLevel.setRange(-1, 9)
+        self.sbArchiveLevel.setSpecialValueText(self.tr("Default"))
+        grid.addWidget(self.sbArchiveLevel, row, 1, 1, 1)
+
+        # Save mode
+        row += 1
+        self.chkDeltaSave = QtWidgets.QCheckBox(self)
+        self.chkDeltaSave.setText(
+            self.tr("Save games as changes to their simulation file")
+        )
+        grid.addWidget(self.chkDeltaSave, row, 1, 1, 1)
+
+        # Autosave mode
+        row += 1
+        grid.addWidget(QtWidgets.QLabel(self.tr("Autosave")), row, 0, 1, 1,
+                       Qt.AlignRight)
+        self.cmbAutosaveMode = QtWidgets.QComboBox()
+        self.cmbAutosaveMode.addItem(self.tr("Off"), "off")
+        self.cmbAutosaveMode.addItem(self.tr("Every interval of sim time"),
+                                     "sim")
+        self.cmbAutosaveMode.addItem(self.tr("Every interval of real time"),
+                                     "wall")
+        grid.addWidget(self.cmbAutosaveMode, row, 1, 1, 1)
+
+        # Autosave interval
+        row += 1
+        grid.addWidget(QtWidgets.QLabel(self.tr("Autosave interval")), row, 0,
+                       1, 1, Qt.AlignRight)
+        self.sbAutosaveInterval = QtWidgets.QSpinBox()
+        self.sbAutosaveInterval.setRange(1, 240)
+        self.sbAutosaveInterval.setSuffix(self.tr(" min"))
+        grid.addWidget(self.sbAutosaveInterval, row, 1, 1, 1)
+
+        # Autosave count
+        row += 1
+        grid.addWidget(QtWidgets.QLabel(self.tr("Autosave files")), row, 0,
+                       1, 1, Qt.AlignRight)
+        self.sbAutosaveCount = QtWidgets.QSpinBox()
+        self.sbAutosaveCount.setRange(1, 20)
+        grid.addWidget(self.sbAutosaveCount, row, 1, 1, 1)
+
+        # UI refresh rate
+        row += 1
+        grid.addWidget(QtWidgets.QLabel(self.tr("Views refresh rate")), row,
+                       0, 1, 1, Qt.AlignRight)
+        self.sbRefreshRate = QtWidgets.QSpinBox()
+        self.sbRefreshRate.setRange(1, 60)
+        self.sbRefreshRate.setSuffix(self.tr(" Hz"))
+        grid.addWidget(self.sbRefreshRate, row, 1, 1, 1)
+
+        grid.setColumnStretch(0, 0)
+        grid.setColumnStretch(1, 10)
+
         # ======================
         # Path Options
         grp = QtWidgets.QGroupBox()
@@ -112,6 +188,35 @@ class SettingsDialog(QtWidgets.QDialog):
         v = settings.b(settings.LOAD_LAST, False)
         self.chkLoadLast.setChecked(v)
 
+        self.cmbArchiveCodec.setCurrentText(settings.archiveCodec())
+        self.sbArchiveLevel.setValue(settings.i(settings.ARCHIVE_LEVEL, -1))
+        self.cmbArchiveCodec.currentTextChanged.connect(self.onArchiveCodec)
+        self.sbArchiveLevel.valueChanged.connect(self.onArchiveLevel)
+
+        self.chkDeltaSave.setChecked(settings.saveMode() == "delta")
+        self.chkDeltaSave.toggled.connect(self.onDeltaSave)
+
+        self.cmbAutosaveMode.setCurrentIndex(
+            self.cmbAutosaveMode.findData(settings.autosaveMode())
+        )
+        self.sbAutosaveInterval.setValue(
+            settings.i(settings.AUTOSAVE_INTERVAL,
+                       settings.DEFAULT_AUTOSAVE_INTERVAL)
+        )
+        self.sbAutosaveCount.setValue(
+            settings.i(settings.AUTOSAVE_COUNT,
+                       settings.DEFAULT_AUTOSAVE_COUNT)
+        )
+        self.cmbAutosaveMode.currentIndexChanged.connect(self.onAutosaveMode)
+        self.sbAutosaveInterval.valueChanged.connect(self.onAutosaveInterval)
+        self.sbAutosaveCount.valueChanged.connect(self.onAutosaveCount)
+
+        self.sbRefreshRate.setValue(
+            settings.i(settings.UI_REFRESH_RATE,
+                       settings.DEFAULT_UI_REFRESH_RATE)
+        )
+        self.sbRefreshRate.valueChanged.connect(self.onRefreshRate)
+
         self.txtDataDir.setText(settings.userDataDir)
         self.txtSimsDir.setText(settings.simulationsDir)
 
@@ -120,6 +225,35 @@ class SettingsDialog(QtWidgets.QDialog):
         settings.setValue(settings.LOAD_LAST, v)
         settings.sync()
 
+    def onArchiveCodec(self, codec):
+        settings.setValue(settings.ARCHIVE_CODEC, codec)
+        settings.sync()
+
+    def onArchiveLevel(self, level):
+        settings.setValue(settings.ARCHIVE_LEVEL, level)
+        settings.sync()
+
+    def onDeltaSave(self, checked):
+        settings.setValue(settings.SAVE_MODE, "delta" if checked else "full")
+        settings.sync()
+
+    def onAutosaveMode(self, index):
+        settings.setValue(settings.AUTOSAVE_MODE,
+                          self.cmbAutosaveMode.itemData(index))
+        settings.sync()
+
+    def onAutosaveInterval(self, minutes):
+        settings.setValue(settings.AUTOSAVE_INTERVAL, minutes)
+        settings.sync()
+
+    def onAutosaveCount(self, count):
+        settings.setValue(settings.AUTOSAVE_COUNT, count)
+        settings.sync()
+
+    def onRefreshRate(self, rate):
+        settings.setValue(settings.UI_REFRESH_RATE, rate)
+        settings.sync()
+
     def closeEvent(self, ev):
         settings.setValue(settings.INITIAL_SETUP, "1")
         settings.sync()
@@ -0,0 +1,157 @@
+#
+#   Copyright (C) 2008-2015 by Nicolas Piganeau
+#   npi@m4x.org
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 2 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program; if not, write to the
+#   Free Software Foundation, Inc.,
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+
+"""Offscreen rendering of the scenery of a simulation into images.
+
+Rendering only needs a ``QApplication``, so that it also works without any
+window, e.g. on the ``offscreen`` Qt platform in batch runs.
+"""
+
+import os
+
+from Qt import QtCore, QtGui, Qt
+
+SNAPSHOT_FILE = "frame-%06i.png"
+"""File name pattern of the frames written by a :class:`SnapshotRenderer`"""
+
+DEFAULT_WIDTH = 1920
+DEFAULT_HEIGHT = 1080
+
+MARGIN = 20
+"""Margin in scene units around the items of the scene"""
+
+
+def sceneRect(simulation):
+    """
+    :return: the rect of the scene of simulation covering all its items
+    :rtype: ``QRectF``
+    """
+    return simulation.scene.itemsBoundingRect().adjusted(
+        -MARGIN, -MARGIN, MARGIN, MARGIN
+    )
+
+
+def renderScene(simulation, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT,
+                source=None):
+    """Renders the scene of simulation into a new image.
+
+    :param simulation: The :class:`~ts2.simulation.Simulation` to render
+    :param int width: Width of the image in pixels
+    :param int height: Height of the image in pixels
+    :param QRectF source: Rect of the scene to render, scaled to fit the
+                          image. Defaults to :func:`sceneRect`.
+    :rtype: ``QImage``
+    """
+    # The graphics of the current tick may not have been updated yet
+    simulation.flushGraphics()
+    if source is None:
+        source = sceneRect(simulation)
+    image = QtGui.QImage(width, height,
+                         QtGui.QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.black)
+    painter = QtGui.QPainter(image)
+    simulation.scene.render(painter, QtCore.QRectF(image.rect()), source,
+                            Qt.KeepAspectRatio)
+    painter.end()
+    return image
+
+
+class SnapshotRenderer(QtCore.QObject):
+    """Writes a PNG image of the scene of a simulation every interval of sim
+    time, as a numbered frame sequence which can be assembled into a video.
+
+    Frames are scheduled from the timeChanged signal of the simulation, so
+    that they follow the simulation time whatever the speed at which it is
+    run, including at full speed with
+    :meth:`~ts2.simulation.Simulation.advance`. Frames which are due are
+    only rendered once back in the event loop, so as not to delay the tick,
+    or when :meth:`flush` is called, e.g. after each call to
+    :meth:`~ts2.simulation.Simulation.advance` when there is no event loop.
+    If several frames fall due in the same tick, the same image is written
+    for each of them, so that the sequence keeps a constant sim time
+    between frames."""
+
+    frameSaved = QtCore.pyqtSignal(str)
+    frameFailed = QtCore.pyqtSignal(str)
+
+    def __init__(self, simulation, directory, interval,
+                 width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT):
+        """Constructor for the SnapshotRenderer class.
+
+        :param simulation: The :class:`~ts2.simulation.Simulation` to render.
+                           It is the parent of the renderer.
+        :param str directory: Directory in which the frames are written. It
+                              is created if needed.
+        :param float interval: Sim time between two frames, in seconds
+        :param int width: Width of the frames in pixels
+        :param int height: Height of the frames in pixels
+        """
+        super().__init__(simulation)
+        self.simulation = simulation
+        self.directory = directory
+        self.interval = interval
+        self.width = width
+        self.height = height
+        self.frame = 0
+        self._source = sceneRect(simulation)
+        self._nextTime = simulation.currentTime
+        self._due = 0
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.flush)
+        os.makedirs(directory, exist_ok=True)
+        simulation.timeChanged.connect(self.onTimeChanged)
+
+    @QtCore.pyqtSlot(float)
+    def onTimeChanged(self, time):
+        if time >= self._nextTime:
+            self._timer.start()
+            while self._nextTime <= time:
+                self._due += 1
+                self._nextTime += self.interval
+
+    @QtCore.pyqtSlot()
+    def flush(self):
+        """Writes the frames which are due, if any."""
+        self._timer.stop()
+        if self._due:
+            count = self._due
+            self._due = 0
+            self.capture(count)
+
+    def capture(self, count=1):
+        """Renders the scene now and writes it as the next count frames."""
+        image = renderScene(self.simulation, self.width, self.height,
+                            self._source)
+        for _ in range(count):
+            fileName = os.path.join(self.directory,
+                                    SNAPSHOT_FILE % self.frame)
+            self.frame += 1
+            if image.save(fileName):
+                self.frameSaved.emit(fileName)
+            else:
+                self.frameFailed.emit(fileName)
+
+    def stop(self):
+        """Stops writing frames."""
+        self._timer.stop()
+        self._due = 0
+        self.simulation.timeChanged.disconnect(self.onTimeChanged)
@@ -0,0 +1,142 @@
+#
+#   Copyright (C) 2008-2015 by Nicolas Piganeau
+#   npi@m4x.org
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 2 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program; if not, write to the
+#   Free Software Foundation, Inc.,
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+
+import collections
+import math
+
+from Qt import QtCore, QtGui, QtWidgets, Qt
+
+TILE_SIZE = 512
+"""Size in device pixels of the tiles of the static layer"""
+
+TILE_CACHE_SIZE = 64
+"""Maximum number of tiles kept in memory"""
+
+
+class StaticLayer:
+    """Pre-rendered static layer of the scenery of a game.
+
+    The graphics items of the scenery which never change during the game,
+    i.e. the items of the track items whose ``staticGraphics`` attribute is
+    True, are rendered in their neutral state into image tiles at the
+    current zoom, which the view draws as its background. While the layer
+    is set as the ``staticLayer`` of the simulation, these items do not
+    paint their neutral state themselves, so that repainting the view does
+    not depend on the number of static items. Only their changing parts,
+    such as route highlights, are painted live on top of the tiles.
+    """
+
+    def __init__(self, simulation):
+        """Constructor for the StaticLayer class.
+
+        :param simulation: The :class:`~ts2.simulation.Simulation` whose
+                           scenery is rendered
+        """
+        self.simulation = simulation
+        self.rendering = False
+        self._items = None
+        self._tiles = collections.OrderedDict()
+        self._scale = None
+
+    def staticItems(self):
+        """
+        :return: the set of the static graphics items of the scene
+        """
+        if self._items is None:
+            self._items = {
+                gi for gi in self.simulation.scene.items()
+                if isStatic(gi)
+            }
+        return self._items
+
+    def paint(self, painter, rect, scale, pixelRatio=1.0):
+        """Draws the tiles covering rect on painter.
+
+        :param painter: A painter in scene coordinates
+        :param QRectF rect: The exposed rect, in scene coordinates
+        :param float scale: The zoom of the view
+        :param float pixelRatio: The device pixel ratio of the view
+        """
+        if scale != self._scale:
+            self._tiles.clear()
+            self._scale = scale
+        tileSize = TILE_SIZE / scale
+        for i in range(math.floor(rect.left() / tileSize),
+                       math.floor(rect.right() / tileSize) + 1):
+            for j in range(math.floor(rect.top() / tileSize),
+                           math.floor(rect.bottom() / tileSize) + 1):
+                tile = self.tile(i, j, scale, pixelRatio)
+                if tile is not None:
+                    painter.drawPixmap(
+                        QtCore.QRectF(i * tileSize, j * tileSize,
+                                      tileSize, tileSize),
+                        tile, QtCore.QRectF(tile.rect())
+                    )
+
+    def tile(self, i, j, scale, pixelRatio):
+        """
+        :return: the tile (i, j) at scale, rendered if it is not in the
+                 cache, or None if it is empty.
+        :rtype: ``QPixmap``
+        """
+        key = (i, j, pixelRatio)
+        if key in self._tiles:
+            self._tiles.move_to_end(key)
+            return self._tiles[key]
+        tileSize = TILE_SIZE / scale
+        sceneRect = QtCore.QRectF(i * tileSize, j * tileSize,
+                                  tileSize, tileSize)
+        staticItems = self.staticItems()
+        items = [gi for gi in self.simulation.scene.items(
+            sceneRect, Qt.IntersectsItemBoundingRect, Qt.AscendingOrder
+        ) if gi in staticItems and gi.isVisible()]
+        tile = None
+        if items:
+            size = math.ceil(TILE_SIZE * pixelRatio)
+            tile = QtGui.QPixmap(size, size)
+            tile.fill(Qt.transparent)
+            base = QtGui.QTransform()
+            base.scale(scale * pixelRatio, scale * pixelRatio)
+            base.translate(-sceneRect.left(), -sceneRect.top())
+            painter = QtGui.QPainter(tile)
+            option = QtWidgets.QStyleOptionGraphicsItem()
+            self.rendering = True
+            try:
+                for gi in items:
+                    painter.setTransform(gi.sceneTransform() * base)
+                    option.exposedRect = gi.boundingRect()
+                    gi.paint(painter, option, None)
+            finally:
+                self.rendering = False
+                painter.end()
+        self._tiles[key] = tile
+        if len(self._tiles) > TILE_CACHE_SIZE:
+            self._tiles.popitem(last=False)
+        return tile
+
+
+def isStatic(graphicsItem):
+    """
+    :return: True if graphicsItem belongs to the static layer
+    """
+    trackItem = getattr(graphicsItem, "trackItem", None)
+    if trackItem is not None:
+        return trackItem.staticGraphics
+    return getattr(graphicsItem, "staticGraphics", False)
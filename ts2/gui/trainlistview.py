@@ -18,17 +18,114 @@
 #   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
 #
 
-from Qt import QtCore, QtWidgets
+from Qt import QtCore, QtWidgets, Qt
 
 from ts2 import simulation
+from ts2.trains import TrainStatus
+
+
+class TrainListProxyModel(QtCore.QSortFilterProxyModel):
+    """Sorts and filters the trains of the
+    :class:`~ts2.trains.train.TrainListModel`.
+
+    Sorting uses the sort keys of the source model, in its Qt.UserRole, and
+    is dynamic: when rows of the source model change, only these rows are
+    moved to their new position. Source rows are train ids, so that
+    :meth:`trainId` and :meth:`trainIndex` map between the view and the
+    trains of the simulation."""
+
+    def __init__(self, parent=None):
+        """Constructor for the TrainListProxyModel class."""
+        super().__init__(parent)
+        self._statuses = None
+        self._servicePrefix = ""
+        self.setSortRole(Qt.UserRole)
+        self.setDynamicSortFilter(True)
+
+    def setStatusFilter(self, statuses):
+        """Only shows the trains whose status is in statuses, or all the
+        trains if statuses is None."""
+        self._statuses = None if statuses is None else set(statuses)
+        self.invalidateFilter()
+
+    def setServicePrefix(self, prefix):
+        """Only shows the trains whose service code starts with prefix,
+        ignoring case."""
+        self._servicePrefix = prefix.strip().upper()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, sourceRow, sourceParent):
+        train = self.sourceModel().simulation.trains[sourceRow]
+        if self._statuses is not None and train.status not in self._statuses:
+            return False
+        return train.serviceCode.upper().startswith(self._servicePrefix)
+
+    def trainId(self, index):
+        """
+        :return: the id of the train at index of this model
+        """
+        return self.mapToSource(index).row()
+
+    def trainIndex(self, trainId):
+        """
+        :return: the index of this model of the train trainId, which is
+                 invalid if the train is filtered out.
+        """
+        return self.mapFromSource(self.sourceModel().index(trainId, 0))
+
+
+class TrainFilterWidget(QtWidgets.QWidget):
+    """Widget to set the filters of a :class:`TrainListProxyModel`."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.proxyModel = None
+        layout = QtWidgets.QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(layout)
+        self.cmbStatus = QtWidgets.QComboBox()
+        self.cmbStatus.addItem(self.tr("All trains"), None)
+        self.cmbStatus.addItem(
+            self.tr("Active trains"),
+            [TrainStatus.RUNNING, TrainStatus.STOPPED, TrainStatus.WAITING]
+        )
+        for status in (TrainStatus.INACTIVE, TrainStatus.RUNNING,
+                       TrainStatus.STOPPED, TrainStatus.WAITING,
+                       TrainStatus.OUT, TrainStatus.END_OF_SERVICE):
+            self.cmbStatus.addItem(TrainStatus.text(status), [status])
+        self.cmbStatus.currentIndexChanged.connect(self.onStatusChanged)
+        layout.addWidget(self.cmbStatus)
+        self.txtService = QtWidgets.QLineEdit()
+        self.txtService.setPlaceholderText(self.tr("Service code"))
+        self.txtService.setClearButtonEnabled(True)
+        self.txtService.textChanged.connect(self.onServiceChanged)
+        layout.addWidget(self.txtService, 1)
+
+    def setProxyModel(self, proxyModel):
+        """Applies the current filters to proxyModel, and the next ones."""
+        self.proxyModel = proxyModel
+        proxyModel.setStatusFilter(self.cmbStatus.currentData())
+        proxyModel.setServicePrefix(self.txtService.text())
+
+    @QtCore.pyqtSlot(int)
+    def onStatusChanged(self, index):
+        if self.proxyModel is not None:
+            self.proxyModel.setStatusFilter(self.cmbStatus.itemData(index))
+
+    @QtCore.pyqtSlot(str)
+    def onServiceChanged(self, text):
+        if self.proxyModel is not None:
+            self.proxyModel.setServicePrefix(text)
 
 
 class TrainListView(QtWidgets.QTreeView):
-    """ TODO Document TrainListView class"""
+    """View of the trains of the game, through a
+    :class:`TrainListProxyModel`."""
 
     def __init__(self, parent):
         super().__init__(parent)
         self.simulation = None
+        self.filterWidget = TrainFilterWidget(self)
         self.setItemsExpandable(False)
         self.setRootIsDecorated(False)
         self.setHeaderHidden(False)
@@ -38,7 +135,7 @@ class TrainListView(QtWidgets.QTreeView):
 
     @QtCore.pyqtSlot(int)
     def updateTrainSelection(self, trainId):
-        index = self.model().index(trainId, 0)
+        index = self.model().trainIndex(trainId)
         self.selectionModel().select(index,
                                      QtCore.QItemSelectionModel.Rows |
                                      QtCore.QItemSelectionModel.ClearAndSelect)
@@ -46,21 +143,25 @@ class TrainListView(QtWidgets.QTreeView):
     @QtCore.pyqtSlot(simulation.Simulation)
     def setupTrainList(self, sim):
         self.simulation = sim
-        # if self.model() is None:
-        # trainsSortedModel = QSortFilterProxyModel()
-        # trainsSortedModel.setSourceModel()
-        self.setModel(self.simulation.trainListModel)
+        proxyModel = TrainListProxyModel(self)
+        proxyModel.setSourceModel(self.simulation.trainListModel)
+        self.filterWidget.setProxyModel(proxyModel)
+        oldModel = self.model()
+        self.setModel(proxyModel)
+        if oldModel is not None:
+            oldModel.deleteLater()
         self.header().setStretchLastSection(False)
-        self.header().setSortIndicatorShown(False)
+        # Keep the order of the simulation until a column is clicked
+        self.header().setSortIndicator(-1, Qt.AscendingOrder)
         self.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
-        self.simulation.trainStatusChanged.connect(self.model().update)
-        # self.simulation.timeChanged.connect(self.model().update)
-        # self.trainSelected.connect(self.simulation.selectedTrainModel.setTrainByServiceCode)
+        self.simulation.trainStatusChanged.connect(
+            self.simulation.trainListModel.update
+        )
 
     def contextMenuEvent(self, event):
-        index = self.selectionModel().selection().indexes()[0]
-        if index.isValid():
-            train = self.simulation.trains[index.row()]
+        indexes = self.selectionModel().selection().indexes()
+        if indexes and indexes[0].isValid():
+            train = self.simulation.trains[self.model().trainId(indexes[0])]
             train.showTrainActionsMenu(self, event.globalPos())
 
     @QtCore.pyqtSlot(QtCore.QItemSelection, QtCore.QItemSelection)
@@ -69,4 +170,4 @@ class TrainListView(QtWidgets.QTreeView):
         if len(selected.indexes()) > 0:
             index = selected.indexes()[0]
             if index.isValid():
-                self.trainSelected.emit(index.row())
+                self.trainSelected.emit(self.model().trainId(index))
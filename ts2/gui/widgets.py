@@ -20,6 +20,8 @@
 
 from Qt import QtCore, QtWidgets, Qt
 
+from ts2 import utils
+
 
 class ClockWidget(QtWidgets.QLCDNumber):
     """Clock LCD Widget"""
@@ -35,9 +37,10 @@ class ClockWidget(QtWidgets.QLCDNumber):
         self.display("--:--:--")
         self.resize(100, 20)
 
-    @QtCore.pyqtSlot(QtCore.QTime)
+    @QtCore.pyqtSlot(float)
     def setTime(self, t):
-        self.display(t.toString("hh:mm:ss"))
+        """Displays the sim time t, given in seconds."""
+        self.display(utils.toQTime(t).toString("hh:mm:ss"))
 
 
 class ZoomWidget(QtWidgets.QWidget):
@@ -93,6 +96,21 @@ class XGraphicsView(QtWidgets.QGraphicsView):
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.staticLayer = None
+
+    def setStaticLayer(self, staticLayer):
+        """Sets the :class:`~ts2.gui.staticlayer.StaticLayer` drawn as the
+        background of this view, or None."""
+        self.staticLayer = staticLayer
+        self.resetCachedContent()
+        self.viewport().update()
+
+    def drawBackground(self, painter, rect):
+        """Reimplemented to draw the static layer, if any."""
+        super().drawBackground(painter, rect)
+        if self.staticLayer is not None:
+            self.staticLayer.paint(painter, rect, self.transform().m11(),
+                                   self.devicePixelRatioF())
 
     def wheelEvent(self, ev):
         """Override the wheelEvent, and send signal with direction"""
@@ -0,0 +1,181 @@
+#
+#   Copyright (C) 2008-2015 by Nicolas Piganeau
+#   npi@m4x.org
+#
+#   This program is free software; you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation; either version 2 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program; if not, write to the
+#   Free Software Foundation, Inc.,
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+
+"""Incremental reading of large JSON documents.
+
+:class:`JsonStreamReader` reads a JSON document from a stream chunk by chunk
+and lets the caller walk through its objects and arrays, decoding one member
+at a time. Only the current chunk and the member being decoded are held in
+memory, instead of the whole document text.
+"""
+
+import io
+
+import simplejson as json
+from Qt import QtWidgets
+
+from ts2 import utils
+
+translate = QtWidgets.qApp.translate
+
+CHUNK_SIZE = 65536
+"""Number of characters read from the stream at a time."""
+
+WHITESPACE = " \t\n\r"
+
+DELIMITERS = WHITESPACE + ",]}"
+
+
+class JsonStreamReader:
+    """Reads a JSON document incrementally from a stream.
+
+    Use :meth:`members` and :meth:`elements` to walk through objects and
+    arrays, and :meth:`value` to decode a whole value at the current
+    position, e.g.::
+
+        reader = JsonStreamReader(stream, objectHook)
+        for key in reader.members():
+            doSomething(key, reader.value())
+    """
+
+    def __init__(self, stream, objectHook=None, chunkSize=CHUNK_SIZE):
+        """Constructor for the JsonStreamReader class.
+
+        :param stream: A text or binary (UTF-8) file-like object
+        :param objectHook: Hook called with each decoded JSON object dict,
+                           as in ``json.load()``
+        :param int chunkSize: Number of characters to read at a time
+        """
+        if not isinstance(stream, io.TextIOBase):
+            stream = io.TextIOWrapper(stream, encoding="utf-8")
+        self._stream = stream
+        self._scanner = json.JSONDecoder()
+        self._decoder = None
+        if objectHook is not None:
+            self._decoder = json.JSONDecoder(object_hook=objectHook)
+        self._chunkSize = chunkSize
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size=None):
+        """Discards the consumed part of the buffer and appends the next
+        chunk of the stream, or the next size characters, to it."""
+        chunk = self._stream.read(size or self._chunkSize)
+        if not chunk:
+            self._eof = True
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+
+    def _fillMore(self):
+        """Fills the buffer with as many characters as it holds."""
+        self._fill(max(self._chunkSize, len(self._buffer) - self._pos))
+
+    def _error(self):
+        return utils.FormatException(
+            translate("JsonStreamReader",
+                      "Invalid JSON data in simulation file")
+        )
+
+    def peek(self):
+        """Skips whitespace and returns the next character of the document
+        without consuming it, or an empty string at the end of the
+        document."""
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer) or self._eof:
+                return buffer[pos:pos + 1]
+            self._fill()
+
+    def expect(self, chars):
+        """Consumes the next character, which must be one of chars, and
+        returns it."""
+        char = self.peek()
+        if not char or char not in chars:
+            raise self._error()
+        self._pos += 1
+        return char
+
+    def value(self):
+        """Decodes and returns the whole JSON value at the current
+        position.
+
+        The end of the value is found by decoding it without the object
+        hook. If the value is not complete in the buffer, as much text as
+        the buffer holds is read before trying again, so that the size of
+        the buffer doubles and a large value is scanned about twice in
+        total. The object hook is only run once the value is complete."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self._scanner.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as err:
+                if self._eof:
+                    raise self._error() from err
+                self._fillMore()
+                continue
+            following = self._buffer[end:end + 1]
+            if isinstance(obj, (int, float)) and not self._eof and \
+                    (not following or following not in DELIMITERS):
+                # The number may continue in the next chunk
+                self._fillMore()
+                continue
+            if self._decoder is not None and \
+                    isinstance(obj, (dict, list)):
+                obj, end = self._decoder.raw_decode(self._buffer, self._pos)
+            self._pos = end
+            return obj
+
+    def members(self):
+        """Yields the keys of the JSON object at the current position.
+
+        After each key is yielded, the caller must consume its value with
+        :meth:`value`, :meth:`members` or :meth:`elements`."""
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.expect(",}") == "}":
+                return
+
+    def elements(self):
+        """Yields the index of each element of the JSON array at the current
+        position.
+
+        After each index is yielded, the caller must consume the element
+        with :meth:`value`, :meth:`members` or :meth:`elements`."""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            if self.expect(",]") == "]":
+                return
@@ -18,15 +18,15 @@
 #   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
 #
 
-import zipfile
 import os
 
 from Qt import QtCore, QtGui, QtWidgets, Qt
 
 from ts2 import simulation, utils
 from ts2.gui import dialogs, trainlistview, servicelistview, widgets, \
-    opendialog, settingsdialog
+    opendialog, settingsdialog, staticlayer, minimap
 from ts2.scenery import placeitem
+from ts2.game import saver
 from ts2.editor import editorwindow
 from ts2.utils import settings
 
@@ -44,9 +44,11 @@ class MainWindow(QtWidgets.QMainWindow):
         MainWindow._self = self
 
         self.fileName = None
+        self.eventsFileName = None
 
         if args:
             settings.setDebug(args.debug)
+            self.eventsFileName = getattr(args, "events", None)
             if args.file:
                 # TODO absolute paths
                 self.fileName = args.file
@@ -59,6 +61,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
         # Simulation
         self.simulation = None
+        self.autosaver = None
 
         # Actions  ======================================
         self.openAction = QtWidgets.QAction(self.tr("&Open..."), self)
@@ -184,7 +187,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
         # Time factor spinBox
         self.timeFactorSpinBox = QtWidgets.QSpinBox(self)
-        self.timeFactorSpinBox.setRange(1, 10)
+        self.timeFactorSpinBox.setRange(1, simulation.MAX_TIME_FACTOR)
         self.timeFactorSpinBox.setSingleStep(1)
         self.timeFactorSpinBox.setValue(1)
         self.timeFactorSpinBox.setSuffix("x")
@@ -348,7 +351,10 @@ class MainWindow(QtWidgets.QMainWindow):
         self.trainListPanel.setObjectName("trains_panel")
         self.trainListView = trainlistview.TrainListView(self)
         self.simulationLoaded.connect(self.trainListView.setupTrainList)
-        self.trainListPanel.setWidget(self.trainListView)
+        wid = widgets.VBoxWidget()
+        wid.addWidget(self.trainListView.filterWidget)
+        wid.addWidget(self.trainListView, 1)
+        self.trainListPanel.setWidget(wid)
         self.addDockWidget(Qt.BottomDockWidgetArea, self.trainListPanel)
 
         # Services
@@ -373,6 +379,9 @@ class MainWindow(QtWidgets.QMainWindow):
         self.loggerView.setItemsExpandable(False)
         self.loggerView.setRootIsDecorated(False)
         self.loggerView.setHeaderHidden(True)
+        # Only the rows on screen are queried, so that spilled messages are
+        # read back from disk only when scrolled to
+        self.loggerView.setUniformRowHeights(True)
         self.loggerView.setPalette(QtGui.QPalette(Qt.black))
         self.loggerView.setVerticalScrollMode(
             QtWidgets.QAbstractItemView.ScrollPerItem
@@ -392,6 +401,17 @@ class MainWindow(QtWidgets.QMainWindow):
         self.view.setPalette(QtGui.QPalette(Qt.black))
         self.view.wheelChanged.connect(self.onWheelChanged)
 
+        # Overview
+        self.minimapPanel = QtWidgets.QDockWidget(self.tr("Overview"), self)
+        self.minimapPanel.setFeatures(
+            QtWidgets.QDockWidget.DockWidgetMovable |
+            QtWidgets.QDockWidget.DockWidgetFloatable
+        )
+        self.minimapPanel.setObjectName("overview_panel")
+        self.minimap = minimap.MinimapWidget(self.view, self)
+        self.minimapPanel.setWidget(self.minimap)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.minimapPanel)
+
         # Display
         self.grid = QtWidgets.QVBoxLayout()
         self.grid.setContentsMargins(0, 0, 0, 0)
@@ -400,6 +420,9 @@ class MainWindow(QtWidgets.QMainWindow):
         self.board.setLayout(self.grid)
         self.setCentralWidget(self.board)
 
+        # Status bar
+        self.setStatusBar(widgets.StatusBar())
+
         # Editor
         self.editorOpened = False
         self.setControlsDisabled(True)
@@ -454,13 +477,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 self.simulation = None
 
             try:
-                if zipfile.is_zipfile(fileName):
-                    with zipfile.ZipFile(fileName) as zipArchive:
-                        with zipArchive.open("simulation.json") as file:
-                            self.simulation = simulation.load(self, file)
-                else:
-                    with open(fileName) as file:
-                        self.simulation = simulation.load(self, file)
+                self.simulation = simulation.loadFile(self, fileName)
             except (utils.FormatException,
                     utils.MissingDependencyException) as err:
                 QtWidgets.QMessageBox.critical(
@@ -505,6 +522,9 @@ class MainWindow(QtWidgets.QMainWindow):
         self.loggerView.setModel(self.simulation.messageLogger)
         # Set scene
         self.view.setScene(self.simulation.scene)
+        self.simulation.staticLayer = staticlayer.StaticLayer(self.simulation)
+        self.view.setStaticLayer(self.simulation.staticLayer)
+        self.minimap.setSimulation(self.simulation)
         # TrainListView
         self.trainListView.trainSelected.connect(
             self.simulation.trainSelected
@@ -545,6 +565,16 @@ class MainWindow(QtWidgets.QMainWindow):
         )
         self.scoreDisplay.display(self.simulation.scorer.score)
 
+        # Saving
+        self.simulation.saveStarted.connect(self.onSaveStarted)
+        self.simulation.saved.connect(self.onSaved)
+        self.simulation.saveFailed.connect(self.onSaveFailed)
+        self.autosaver = saver.Autosaver(self.simulation)
+        if self.eventsFileName:
+            self.simulation.recordEvents(self.eventsFileName)
+        self.autosaver.checkpointSaved.connect(self.onAutosaved)
+        self.autosaver.checkpointFailed.connect(self.onSaveFailed)
+
         # Menus
         self.saveGameAsAction.setEnabled(True)
         self.propertiesAction.setEnabled(True)
@@ -557,6 +587,14 @@ class MainWindow(QtWidgets.QMainWindow):
         self.loggerView.setModel(None)
         # Unset scene
         self.view.setScene(None)
+        self.view.setStaticLayer(None)
+        self.simulation.staticLayer = None
+        self.minimap.setSimulation(None)
+        self.simulation.close()
+        # Stop autosave
+        if self.autosaver is not None:
+            self.autosaver.stop()
+            self.autosaver = None
         # Disconnect signals
         try:
             self.simulation.trainSelected.disconnect()
@@ -586,15 +624,26 @@ class MainWindow(QtWidgets.QMainWindow):
             self.simulation.scorer.scoreChanged.disconnect()
         except TypeError:
             pass
+        try:
+            self.simulation.saveStarted.disconnect()
+            self.simulation.saved.disconnect()
+            self.simulation.saveFailed.disconnect()
+        except TypeError:
+            pass
         # Menus
         self.saveGameAsAction.setEnabled(False)
         self.propertiesAction.setEnabled(False)
 
     @QtCore.pyqtSlot()
     def saveGame(self):
-        """Saves the current game to file."""
+        """Saves the current game to file.
+
+        The game is paused while the file name is chosen. Saving itself runs
+        in the background."""
         if self.simulation is not None:
-            self.panel.pauseButton.click()
+            paused = self.buttPause.isChecked()
+            if not paused:
+                self.buttPause.click()
             fileName, _ = QtWidgets.QFileDialog.getSaveFileName(
                 self,
                 self.tr("Save the simulation as"),
@@ -602,13 +651,36 @@ class MainWindow(QtWidgets.QMainWindow):
                 self.tr("TS2 game files (*.tsg)")
             )
             if fileName != "":
-                QtWidgets.QApplication.setOverrideCursor(Qt.WaitCursor)
-                # try:
                 self.simulation.saveGame(fileName)
-                # except:
-                #     dialogs.ExceptionDialog.popupException(self)
-                settings.addRecent(fileName)
-                QtWidgets.QApplication.restoreOverrideCursor()
+            if not paused:
+                self.buttPause.click()
+
+    @QtCore.pyqtSlot(str)
+    def onSaveStarted(self, fileName):
+        self.statusBar().showMessage(self.tr("Saving %s") % fileName,
+                                     info=True)
+        self.statusBar().showBusy(True)
+
+    @QtCore.pyqtSlot(str)
+    def onSaved(self, fileName):
+        self.statusBar().showBusy(False)
+        self.statusBar().showMessage(self.tr("Saved %s") % fileName,
+                                     timeout=2, info=True)
+        settings.addRecent(fileName)
+        self.refreshRecent()
+
+    @QtCore.pyqtSlot(str)
+    def onAutosaved(self, fileName):
+        self.statusBar().showMessage(self.tr("Autosaved to %s") % fileName,
+                                     timeout=2, info=True)
+
+    @QtCore.pyqtSlot(str, str)
+    def onSaveFailed(self, fileName, error):
+        self.statusBar().showBusy(False)
+        self.statusBar().showMessage(
+            self.tr("Error while saving %s: %s") % (fileName, error),
+            warn=True
+        )
 
     @QtCore.pyqtSlot(int)
     def zoom(self, percent):
@@ -705,9 +777,12 @@ class MainWindow(QtWidgets.QMainWindow):
         self.loadSimulation(fileName=act.text())
 
     def closeEvent(self, event):
-        """Save window postions on close"""
+        """Save window postions on close and wait for background saves"""
         settings.saveWindow(self)
         settings.sync()
+        if self.simulation is not None:
+            self.simulation.close()
+        saver.waitForWorkers()
         super().closeEvent(event)
 
     def onWheelChanged(self, direction):
@@ -105,6 +105,7 @@ class PositionGraphicsItem(QtWidgets.QGraphicsPolygonItem):
             self.hide()
 
 
+@utils.typeRegistry.register
 class Position:
     """A ``Position`` object is a point on a :class:`~ts2.scenery.abstract.TrackItem`.
 
@@ -145,6 +146,7 @@ class Position:
         self._trackItem = simulation.trackItem(params['trackItem'])
         self._previousTI = simulation.trackItem(params['previousTI'])
         self._positionOnTI = params['positionOnTI']
+        self._parameters = None
 
     def for_json(self):
         """Dumps the position to JSON.
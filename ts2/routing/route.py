@@ -90,6 +90,7 @@ class RoutesModel(QtCore.QAbstractTableModel):
         return retFlag
 
 
+@utils.typeRegistry.register
 class Route(QtCore.QObject):
     """A Path between two signals
 
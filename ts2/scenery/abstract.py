@@ -74,6 +74,12 @@ class TrackItem(QtCore.QObject):
     - The X-axis is from left to right
     - The Y-axis is from top to bottom.
     """
+
+    staticGraphics = False
+    """True if the neutral state of the graphics of this item type never
+    changes during the game, so that it can be drawn by the static layer of
+    the view. See :class:`~ts2.gui.staticlayer.StaticLayer`."""
+
     def __init__(self, parameters):
         """
         :param parameters: JSON object holding the parameters to create the
@@ -535,6 +541,15 @@ class TrackItem(QtCore.QObject):
 
     @QtCore.pyqtSlot()
     def updateGraphics(self):
+        """Updates the graphics items of this TrackItem. While the
+        simulation is advancing, the update is deferred to the end of the
+        tick, so that an item changed several times in a tick is only
+        updated once. See :meth:`~ts2.simulation.Simulation.markDirty`."""
+        if self.simulation is None or not self.simulation.markDirty(self):
+            self.refreshGraphics()
+
+    def refreshGraphics(self):
+        """Updates the graphics items of this TrackItem immediately."""
         self.__updateGraphics()
 
     def updateTrain(self):
@@ -552,7 +567,7 @@ class TrackItem(QtCore.QObject):
         pen.setWidth(3)
         pen.setJoinStyle(Qt.RoundJoin)
         pen.setCapStyle(Qt.RoundCap)
-        if self.highlighted:
+        if self.highlighted and not self.renderingStaticLayer():
             pen.setColor(Qt.white)
         else:
             pen.setColor(Qt.darkGray)
@@ -603,6 +618,24 @@ class TrackItem(QtCore.QObject):
                 painter.drawPath(self._gi[itemId].shape())
                 # painter.drawRect(self._gi[itemId].boundingRect())
 
+    def paintedInStaticLayer(self):
+        """
+        :return: True if the neutral state of this item is currently drawn
+                 by the static layer of the view, so that the item must not
+                 paint it itself.
+        """
+        layer = self.simulation.staticLayer
+        return layer is not None and not layer.rendering
+
+    def renderingStaticLayer(self):
+        """
+        :return: True if this item is being painted into the static layer,
+                 in which case it must paint its neutral state only, e.g.
+                 without route highlights.
+        """
+        layer = self.simulation.staticLayer
+        return layer is not None and layer.rendering
+
     def graphicsMousePressEvent(self, event, itemId):
         """This function is called by the owned TrackGraphicsItem to handle
         its mousePressEvent. The default implementation in the base class
@@ -26,6 +26,7 @@ from ts2 import utils
 BIG = 1000000000
 
 
+@utils.typeRegistry.register
 class EndItem(abstract.TrackItem):
     """End items are invisible items to which the free ends of other
     trackitems must be connected to prevent the simulation from crashing.
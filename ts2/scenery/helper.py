@@ -18,10 +18,122 @@
 #   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
 #
 
-from Qt import QtCore, QtWidgets, Qt
+from Qt import QtCore, QtGui, QtWidgets, Qt
 
 translate = QtCore.QCoreApplication.translate
 
+LOW_DETAIL_LOD = 0.5
+"""Level of detail under which the scenery is painted in low detail, i.e.
+signals as dots, without texts nor berths, and with plain lines merged."""
+
+
+def levelOfDetail(painter):
+    """
+    :param painter: A painter set up to paint an item
+    :return: the level of detail of the painter, i.e. roughly the number of
+             pixels per scene unit.
+    :rtype: float
+    """
+    return QtWidgets.QStyleOptionGraphicsItem.levelOfDetailFromTransform(
+        painter.worldTransform()
+    )
+
+
+def isLowDetail(painter):
+    """
+    :return: True if the items painted with painter must be painted in low
+             detail. See LOW_DETAIL_LOD.
+    """
+    return levelOfDetail(painter) < LOW_DETAIL_LOD
+
+
+BERTH_FONT = ("Courier New", 11)
+"""Family and pixel size of the font of the signal berths"""
+
+TEXT_CACHE_SIZE = 4096
+"""Maximum number of texts kept in each of the text caches"""
+
+_fonts = {}
+_fontMetrics = {}
+_textRects = {}
+_staticTexts = {}
+
+
+def font(family, pixelSize):
+    """
+    :return: the shared font of the given family and pixel size. It must not
+             be modified.
+    :rtype: ``QFont``
+    """
+    key = (family, pixelSize)
+    result = _fonts.get(key)
+    if result is None:
+        result = QtGui.QFont(family)
+        result.setPixelSize(pixelSize)
+        _fonts[key] = result
+    return result
+
+
+def fontMetrics(family, pixelSize):
+    """
+    :return: the shared metrics of :func:`font` (family, pixelSize)
+    :rtype: ``QFontMetricsF``
+    """
+    key = (family, pixelSize)
+    result = _fontMetrics.get(key)
+    if result is None:
+        result = QtGui.QFontMetricsF(font(family, pixelSize))
+        _fontMetrics[key] = result
+    return result
+
+
+def textRect(text):
+    """
+    :return: the bounding rect of text laid out on a single line in the
+             default font, i.e. the font of the scene.
+    :rtype: ``QRectF``
+    """
+    rect = _textRects.get(text)
+    if rect is None:
+        if len(_textRects) >= TEXT_CACHE_SIZE:
+            _textRects.clear()
+        layout = QtGui.QTextLayout(text)
+        layout.beginLayout()
+        layout.createLine()
+        layout.endLayout()
+        rect = layout.boundingRect()
+        _textRects[text] = rect
+    return QtCore.QRectF(rect)
+
+
+def drawText(painter, pos, text, family=None, pixelSize=None):
+    """Draws text with the baseline starting at pos, like
+    ``QPainter.drawText``, in :func:`font` (family, pixelSize), or in the
+    default font if family is None. The font of painter is changed.
+
+    The layout of the text is cached for each text and font, so that
+    repainting the same text does not lay it out again.
+    """
+    key = (text, family, pixelSize)
+    cached = _staticTexts.get(key)
+    if cached is None:
+        if len(_staticTexts) >= TEXT_CACHE_SIZE:
+            _staticTexts.clear()
+        if family is None:
+            textFont = QtGui.QFont()
+        else:
+            textFont = font(family, pixelSize)
+        staticText = QtGui.QStaticText(text)
+        staticText.setTextFormat(Qt.PlainText)
+        staticText.prepare(QtGui.QTransform(), textFont)
+        cached = (staticText, textFont,
+                  QtGui.QFontMetricsF(textFont).ascent())
+        _staticTexts[key] = cached
+    staticText, textFont, ascent = cached
+    painter.setFont(textFont)
+    painter.drawStaticText(QtCore.QPointF(pos.x(), pos.y() - ascent),
+                           staticText)
+
 
 class TrackGraphicsItem(QtWidgets.QGraphicsItem):
     """Graphical item of a trackItem
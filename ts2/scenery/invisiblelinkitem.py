@@ -24,11 +24,13 @@ from ts2 import utils
 from ts2.scenery import lineitem
 
 
+@utils.typeRegistry.register
 class InvisibleLinkItem(lineitem.LineItem):
     """InvisibleLinkItem behave like line items, but are not represented at
     all on the scenery. They are used to make links between lines or to
     represent bridges and tunnels.
     """
+
     def __init__(self, parameters):
         """Constructor for the InvisibleLinkItem class"""
         super().__init__(parameters)
@@ -41,6 +43,11 @@ class InvisibleLinkItem(lineitem.LineItem):
         """Does nothing as this is an invisible link."""
         pass
 
+    def refreshGraphics(self):
+        """Does nothing during the game as this is an invisible link."""
+        if self.simulation.context != utils.Context.GAME:
+            super().refreshGraphics()
+
     # ## Graphics Methods ###############################################
 
     def graphicsPaint(self, p, options, itemId, widget=None):
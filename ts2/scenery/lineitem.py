@@ -18,6 +18,8 @@
 #   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
 #
 
+import collections
+
 from Qt import QtCore, QtGui, QtWidgets, Qt
 
 from ts2.scenery import helper, abstract
@@ -27,12 +29,149 @@ import ts2.routing.position
 translate = QtWidgets.qApp.translate
 
 
+class LineOverviewItem(QtWidgets.QGraphicsItem):
+    """Graphics item drawing all the line items of the scenery at once in
+    low detail.
+
+    Lines connected end to end are merged into polylines, dropping the
+    points of straight runs, so that the whole track plan is drawn with a
+    single path. Line items which are not highlighted do not paint
+    themselves in low detail and are drawn by this item instead."""
+
+    staticGraphics = True
+
+    def __init__(self, simulation, lineItems):
+        """Constructor for the LineOverviewItem class.
+
+        :param simulation: The simulation of the line items
+        :param lineItems: The line items to draw
+        """
+        super().__init__()
+        self.simulation = simulation
+        self.setZValue(-1)
+        self.pen = QtGui.QPen(Qt.darkGray)
+        self.pen.setWidth(3)
+        self.pen.setJoinStyle(Qt.RoundJoin)
+        self.pen.setCapStyle(Qt.RoundCap)
+        self.path = QtGui.QPainterPath()
+        for run in self.runs(lineItems):
+            points = self.simplify([run[0].sceneLine.p1()] +
+                                   [li.sceneLine.p2() for li in run])
+            self.path.addPolygon(QtGui.QPolygonF(points))
+        self._boundingRect = self.path.boundingRect().adjusted(-3, -3, 3, 3)
+
+    @staticmethod
+    def runs(lineItems):
+        """
+        :return: the lists of lineItems that follow each other end to end.
+        """
+        remaining = {id(li): li for li in lineItems}
+        runs = []
+        for lineItem in lineItems:
+            if id(lineItem) not in remaining:
+                continue
+            del remaining[id(lineItem)]
+            run = collections.deque([lineItem])
+            item = lineItem.nextItem
+            while id(item) in remaining and \
+                    item.sceneLine.p1() == run[-1].sceneLine.p2():
+                del remaining[id(item)]
+                run.append(item)
+                item = item.nextItem
+            item = lineItem.previousItem
+            while id(item) in remaining and \
+                    item.sceneLine.p2() == run[0].sceneLine.p1():
+                del remaining[id(item)]
+                run.appendleft(item)
+                item = item.previousItem
+            runs.append(list(run))
+        return runs
+
+    @staticmethod
+    def simplify(points):
+        """
+        :return: points without the points in the middle of straight
+                 segments.
+        """
+        result = points[:2]
+        for point in points[2:]:
+            a, b = result[-2], result[-1]
+            cross = (b.x() - a.x()) * (point.y() - a.y()) - \
+                (b.y() - a.y()) * (point.x() - a.x())
+            if abs(cross) < 1e-6:
+                result[-1] = point
+            else:
+                result.append(point)
+        return result
+
+    def boundingRect(self):
+        return self._boundingRect
+
+    def paint(self, painter, option, widget=None):
+        layer = self.simulation.staticLayer
+        if layer is not None and not layer.rendering:
+            return
+        if helper.isLowDetail(painter):
+            painter.setPen(self.pen)
+            painter.setBrush(Qt.NoBrush)
+            painter.drawPath(self.path)
+
+
+class TrainLinePool:
+    """Pool of the graphics items showing trains on line items.
+
+    The items of a simulation are added to its scene once, with the same
+    shared pen, and are only hidden when released, so that trains moving
+    from line to line reuse them instead of adding items to the scene."""
+
+    def __init__(self, simulation):
+        """Constructor for the TrainLinePool class.
+
+        :param simulation: The simulation in the scene of which the items
+                           are shown.
+        """
+        self.simulation = simulation
+        self.pen = QtGui.QPen()
+        self.pen.setWidth(3)
+        self.pen.setJoinStyle(Qt.RoundJoin)
+        self.pen.setCapStyle(Qt.RoundCap)
+        self.pen.setColor(Qt.red)
+        self._free = []
+        self.created = 0
+
+    def acquire(self):
+        """
+        :return: a visible train line item, taken from the pool or created.
+        :rtype: ``QGraphicsLineItem``
+        """
+        if self._free:
+            tli = self._free.pop()
+        else:
+            tli = QtWidgets.QGraphicsLineItem()
+            tli.setCursor(Qt.ArrowCursor)
+            tli.setPen(self.pen)
+            tli.setZValue(10)
+            self.simulation.registerGraphicsItem(tli)
+            self.created += 1
+        tli.show()
+        return tli
+
+    def release(self, tli):
+        """Hides tli and returns it to the pool."""
+        tli.hide()
+        self._free.append(tli)
+
+
+@utils.typeRegistry.register
 class LineItem(abstract.ResizableItem):
     """A line is a simple track used to connect other items together. The
     important parameter of a line is its real length, i.e. the length it would
     have in real life, since this will determine the time the train takes to
     travel on it.
     """
+
+    staticGraphics = True
+
     def __init__(self, parameters):
         """Constructor for the LineItem class"""
         super().__init__(parameters)
@@ -56,6 +195,7 @@ class LineItem(abstract.ResizableItem):
         if self._place is not None:
             self._trackCode = trackCode
             self._place.addTrack(self)
+            simulation.indexLineItem(self)
         if simulation.context in utils.Context.EDITORS:
             self._gi[0].setCursor(Qt.PointingHandCursor)
             self.positionSelected.connect(simulation.setSelectedTrainHead)
@@ -128,6 +268,7 @@ class LineItem(abstract.ResizableItem):
     def placeCode(self, value):
         """Setter function for the placeCode property"""
         if self.simulation.context == utils.Context.EDITOR_SCENERY:
+            oldKey = (self._placeCode, self._trackCode)
             place = self.simulation.place(value)
             if place is not None:
                 self._placeCode = value
@@ -135,6 +276,7 @@ class LineItem(abstract.ResizableItem):
                 self._place.addTrack(self)
             else:
                 self._placeCode = ""
+            self.simulation.indexLineItem(self, oldKey)
 
     @property
     def trackCode(self):
@@ -147,10 +289,12 @@ class LineItem(abstract.ResizableItem):
     def trackCode(self, value):
         """Setter function for the trackCode property"""
         if self.simulation.context == utils.Context.EDITOR_SCENERY:
+            oldKey = (self._placeCode, self._trackCode)
             if self._place is not None:
                 self._trackCode = value
             else:
                 self._trackCode = ""
+            self.simulation.indexLineItem(self, oldKey)
 
     @property
     def line(self):
@@ -186,18 +330,12 @@ class LineItem(abstract.ResizableItem):
             by += 20
         self._boundingRect = QtCore.QRectF(lx, ty, rx - lx, by - ty)
 
-    @QtCore.pyqtSlot()
-    def updateGraphics(self):
-        """Updates the TrackGraphicsItem owned by this LineItem"""
+    def refreshGraphics(self):
+        """Updates the TrackGraphicsItem owned by this LineItem, and the
+        train line items during the game."""
         if self.simulation.context == utils.Context.GAME:
-            self.updateTrain()
-        else:
-            super().updateGraphics()
-
-    def updateTrain(self):
-        """Updates the graphics for trains movements only"""
-        self.drawTrain()
-        super().updateGraphics()
+            self.drawTrain()
+        super().refreshGraphics()
 
     # ## Graphics Methods ###############################################
 
@@ -250,11 +388,17 @@ class LineItem(abstract.ResizableItem):
         """This function is called by the owned TrackGraphicsItem to paint its
         painter. Draws the line."""
         super().graphicsPaint(p, options, itemId, widget)
-        if self.highlighted:
+        rendering = self.renderingStaticLayer()
+        if self.highlighted and not rendering:
             # To have the activated line overlap crossing lines if any
             self.graphicsItem.setZValue(6)
         else:
-            self.graphicsItem.setZValue(0)
+            if not rendering:
+                self.graphicsItem.setZValue(0)
+            if self.simulation.context == utils.Context.GAME:
+                if helper.isLowDetail(p) or self.paintedInStaticLayer():
+                    # Drawn by the LineOverviewItem or the static layer
+                    return
         pen = self.getPen()
         p.setPen(pen)
         p.drawLine(self.line)
@@ -288,30 +432,13 @@ class LineItem(abstract.ResizableItem):
 
     def showTrainLineItem(self, lines):
         """Shows the given lines (representing trains) on the scenery."""
-        if lines:
-            # Set the pen
-            p = QtGui.QPen()
-            p.setWidth(3)
-            p.setJoinStyle(Qt.RoundJoin)
-            p.setCapStyle(Qt.RoundCap)
-            p.setColor(Qt.red)
-            for i in range(len(lines)):
-                try:
-                    self._tli[i].setLine(lines[i])
-                except IndexError:
-                    newTli = QtWidgets.QGraphicsLineItem()
-                    newTli.setCursor(Qt.ArrowCursor)
-                    newTli.setPen(p)
-                    newTli.setZValue(10)
-                    newTli.setLine(lines[i])
-                    self.simulation.registerGraphicsItem(newTli)
-                    self._tli.append(newTli)
-                    newTli.show()
-                self._tli[i].update()
-        for i in range(len(lines), len(self._tli)):
-            self._tli[i].hide()
-            self._tli[i].update()
-            del self._tli[i]
+        pool = self.simulation.trainLinePool
+        while len(self._tli) < len(lines):
+            self._tli.append(pool.acquire())
+        while len(self._tli) > len(lines):
+            pool.release(self._tli.pop())
+        for tli, line in zip(self._tli, lines):
+            tli.setLine(line)
 
     def graphicsMousePressEvent(self, event, itemId):
         """This function is called by the owned TrackGraphicsItem to handle
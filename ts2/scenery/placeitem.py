@@ -18,7 +18,7 @@
 #   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
 #
 
-from Qt import QtGui, QtCore, QtWidgets, Qt
+from Qt import QtCore, QtWidgets, Qt
 from ts2 import utils
 from ts2.scenery import abstract, helper
 
@@ -44,11 +44,14 @@ class PlacesModel(QtCore.QAbstractTableModel):
             return placeCodes[index.row()]
 
 
+@utils.typeRegistry.register
 class Place(abstract.TrackItem):
     """A Place is a place where trains will have a schedule (mainly station,
     but can also be a main junction for example)
     """
 
+    staticGraphics = True
+
     def __init__(self, parameters):
         """Constructor for the Place class"""
         super().__init__(parameters)
@@ -63,6 +66,7 @@ class Place(abstract.TrackItem):
         gi.setZValue(self.defaultZValue)
         self._gi[0] = gi
         self._timetable = []
+        self._timetableSorted = True
         self._tracks = {}
 
     @staticmethod
@@ -96,6 +100,8 @@ class Place(abstract.TrackItem):
 
     @property
     def timetable(self):
+        if not self._timetableSorted:
+            self.sortTimetable()
         return self._timetable
 
     @property
@@ -115,24 +121,25 @@ class Place(abstract.TrackItem):
         self._tracks[li.trackCode] = li
 
     def addTimetable(self, sl):
+        """Adds the service line sl to the timetable of this place. The
+        timetable is sorted when next accessed."""
         self._timetable.append(sl)
-        self._timetable.sort(key=lambda x: x.scheduledDepartureTime)
+        self._timetableSorted = False
 
     def track(self, trackCode):
         return self._tracks[trackCode]
 
     def updateBoundingRect(self):
         """Updates the bounding rectangle of the graphics item"""
-        tl = QtGui.QTextLayout(self._name)
-        tl.beginLayout()
-        tl.createLine()
-        tl.endLayout()
-        self._rect = tl.boundingRect()
+        self._rect = helper.textRect(self._name)
 
     @QtCore.pyqtSlot()
     def sortTimetable(self):
         """Sorts the timetable of the place."""
-        self._timetable.sort(key=lambda x: x.scheduledDepartureTime)
+        self._timetable.sort(
+            key=lambda x: utils.timeSortKey(x.scheduledDepartureTime)
+        )
+        self._timetableSorted = True
 
     # ## Graphics Methods ##############################################
 
@@ -152,11 +159,14 @@ class Place(abstract.TrackItem):
         """This function is called by the owned TrackGraphicsItem to paint its
         painter."""
         super().graphicsPaint(p, options, itemId, widget)
+        if self.simulation.context == utils.Context.GAME and \
+                (helper.isLowDetail(p) or self.paintedInStaticLayer()):
+            return
         pen = self.getPen()
         pen.setWidth(0)
         pen.setColor(Qt.white)
         p.setPen(pen)
-        p.drawText(self._rect.bottomLeft(), self.name)
+        helper.drawText(p, self._rect.bottomLeft(), self.name)
 
 
 class PlaceInfoModel(QtCore.QAbstractTableModel):
@@ -180,7 +190,7 @@ class PlaceInfoModel(QtCore.QAbstractTableModel):
         if self._place is not None and role == Qt.DisplayRole:
             line = self._place.timetable[index.row() - 2]
             if index.column() == 0:
-                return line.scheduledDepartureTime
+                return line.scheduledDepartureTimeStr
             elif index.column() == 1:
                 return line.service.serviceCode
             elif index.column() == 2:
@@ -26,10 +26,14 @@ from ts2.scenery import placeitem, helper, abstract
 translate = QtWidgets.qApp.translate
 
 
+@utils.typeRegistry.register
 class PlatformItem(abstract.ResizableItem):
     """Platform items are represented as a colored rectangle on the scene to
     symbolise the platform. This colored rectangle permits user interaction.
     """
+
+    staticGraphics = True
+
     def __init__(self, parameters):
         """Constructor for the PlatformItem class"""
         super().__init__(parameters)
@@ -139,6 +143,8 @@ class PlatformItem(abstract.ResizableItem):
     def graphicsPaint(self, painter, options, itemId, widget=None):
         """This function is called by the owned TrackGraphicsItem to paint its
         painter. Draws the rectangle."""
+        if self.paintedInStaticLayer():
+            return
         x1 = self.origin.x()
         y1 = self.origin.y()
         x2 = self.end.x()
@@ -50,6 +50,7 @@ def getEndValues():
             (0, 5), (-5, 5), (-5, 0), (-5, -5)]
 
 
+@utils.typeRegistry.register
 class PointsItem(abstract.TrackItem):
     """A ``PointsItem`` is a three-way junction.
 
@@ -378,11 +379,15 @@ class PointsItem(abstract.TrackItem):
             if self.trainPresent():
                 pen.setColor(Qt.red)
             p.setPen(pen)
-            p.drawLine(self.commonEnd, self.middle)
             if self.pointsReversed:
-                p.drawLine(self.reverseEnd, self.middle)
+                end = self.reverseEnd
+            else:
+                end = self.normalEnd
+            if helper.isLowDetail(p):
+                p.drawLine(self.commonEnd, end)
             else:
-                p.drawLine(self.normalEnd, self.middle)
+                p.drawLine(self.commonEnd, self.middle)
+                p.drawLine(end, self.middle)
 
     def graphicsBoundingRect(self, itemId):
         """This function is called by the owned TrackGraphicsItem to return
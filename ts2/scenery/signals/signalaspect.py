@@ -18,8 +18,23 @@
 #   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
 #
 
+import math
+
 from Qt import QtCore, QtGui, Qt
 
+from ts2 import utils
+
+ASPECT_CACHE_SIZE = 512
+"""Maximum number of pixmaps held by an :class:`AspectCache`."""
+
+MIN_ZOOM_BUCKET = 0.25
+"""Smallest scale at which aspects are pre-rendered. Aspects painted at a
+smaller scale use the pixmaps of this scale."""
+
+MAX_ZOOM_BUCKET = 16
+"""Largest scale at which aspects are pre-rendered. Aspects painted at a
+larger scale are drawn directly."""
+
 
 class SignalShape:
     """This class holds the possible representation shapes for signal lights.
@@ -58,6 +73,7 @@ class Target:
     BEFORE_NEXT_SIGNAL = 2
 
 
+@utils.typeRegistry.register
 class SignalAspect:
     """SignalAspect class represents an aspect of a signal, that is a
     combination of on and off lights with a meaning for the train driver."""
@@ -71,6 +87,7 @@ class SignalAspect:
         self.shapes = parameters["shapes"]
         self.shapesColors = parameters["shapesColors"]
         self.actions = [tuple(x) for x in parameters["actions"]]
+        self._dotColor = None
 
     def for_json(self):
         """Dumps this SignalAspect to JSON."""
@@ -226,3 +243,113 @@ class SignalAspect:
     def boundingRect(self):
         """Return the boundingRect of this aspect."""
         return QtCore.QRectF(0, -20, 33, 24)
+
+    @property
+    def dotColor(self):
+        """
+        :return: the colour of the first lit light of this aspect, with which
+                 the signal is drawn as a dot in low detail.
+        :rtype: ``QColor``
+        """
+        if self._dotColor is None:
+            self._dotColor = QtGui.QColor(Qt.darkGray)
+            for shape, color in zip(self.shapes, self.shapesColors):
+                if shape != SignalShape.NONE and \
+                        QtGui.QColor(color) != QtGui.QColor(Qt.black):
+                    self._dotColor = QtGui.QColor(color)
+                    break
+        return self._dotColor
+
+    def drawDot(self, p):
+        """Draws the aspect in low detail on the given painter p, as a single
+        dot of :attr:`dotColor`."""
+        p.setPen(Qt.NoPen)
+        p.setBrush(self.dotColor)
+        p.drawEllipse(QtCore.QRectF(1, -9, 9, 9))
+
+
+class AspectCache:
+    """Cache of pre-rendered signal aspect pixmaps.
+
+    Pixmaps are keyed by aspect, pen colours, persistent route marker and
+    zoom bucket, i.e. the painter scale rounded up to a power of two, so that
+    painting a signal is a single pixmap blit instead of a dozen shapes. The
+    cache must be cleared when the aspects are changed, which
+    :class:`~ts2.scenery.signals.signalitem.SignalLibrary` does.
+    """
+
+    def __init__(self):
+        """Constructor for the AspectCache class."""
+        self._pixmaps = {}
+
+    def clear(self):
+        """Discards all the pre-rendered pixmaps."""
+        self._pixmaps.clear()
+
+    @staticmethod
+    def zoomBucket(p):
+        """
+        :param p: The painter on which the aspect is going to be painted
+        :return: the scale at which to pre-render aspects for p, or None if
+                 the scale is too large for a pixmap to be worth it.
+        """
+        transform = p.worldTransform()
+        scale = math.sqrt(abs(transform.determinant()))
+        device = p.device()
+        if device is not None:
+            scale *= device.devicePixelRatioF()
+        if scale <= 0:
+            return None
+        bucket = 2 ** math.ceil(math.log2(scale))
+        if bucket > MAX_ZOOM_BUCKET:
+            return None
+        return max(bucket, MIN_ZOOM_BUCKET)
+
+    def drawAspect(self, p, aspect, linePen, shapePen, persistent=False):
+        """Paints aspect on p as :meth:`SignalAspect.drawAspect` does, from a
+        pre-rendered pixmap if possible."""
+        bucket = self.zoomBucket(p)
+        if bucket is None:
+            aspect.drawAspect(p, linePen, shapePen, persistent)
+            return
+        key = (aspect, linePen.color().rgba(), shapePen.color().rgba(),
+               persistent, bucket)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is None:
+            if len(self._pixmaps) >= ASPECT_CACHE_SIZE:
+                self._pixmaps.clear()
+            pixmap = self.render(aspect, linePen, shapePen, persistent,
+                                 bucket)
+            self._pixmaps[key] = pixmap
+        # The pixmap is scaled down by up to half its size
+        smooth = p.testRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+        if not smooth:
+            p.setRenderHint(QtGui.QPainter.SmoothPixmapTransform, True)
+        p.drawPixmap(self.pixmapRect(aspect), pixmap,
+                     QtCore.QRectF(pixmap.rect()))
+        if not smooth:
+            p.setRenderHint(QtGui.QPainter.SmoothPixmapTransform, False)
+
+    @staticmethod
+    def pixmapRect(aspect):
+        """
+        :return: the rect covered by the pixmaps of aspect, in item
+                 coordinates, i.e. its bounding rect with room for the pens.
+        """
+        return aspect.boundingRect().adjusted(-2, -2, 2, 2)
+
+    def render(self, aspect, linePen, shapePen, persistent, bucket):
+        """
+        :return: a new pixmap of aspect drawn at the scale bucket.
+        :rtype: ``QPixmap``
+        """
+        rect = self.pixmapRect(aspect)
+        pixmap = QtGui.QPixmap(math.ceil(rect.width() * bucket),
+                               math.ceil(rect.height() * bucket))
+        pixmap.fill(Qt.transparent)
+        painter = QtGui.QPainter(pixmap)
+        painter.scale(bucket, bucket)
+        painter.translate(-rect.topLeft())
+        aspect.drawAspect(painter, linePen, shapePen, persistent)
+        painter.end()
+        return pixmap
@@ -115,24 +115,11 @@ BUILTIN_SIGNAL_LIBRARY = """{
 }"""
 
 
-def json_hook(dct):
-    """Hook method for json loading of signal library.
-    :param dict dct: the dictionary to load
-    :return: An class of ``__type__``
-    :rtype: Class instance
-    """
-    if not dct.get('__type__'):
-        return dct
-    elif dct['__type__'] == "SignalLibrary":
-        return SignalLibrary(parameters=dct)
-    elif dct['__type__'] == "SignalType":
-        return SignalType(parameters=dct)
-    elif dct['__type__'] == "SignalState":
-        return SignalState(parameters=dct)
-    elif dct['__type__'] == "SignalAspect":
-        return signalaspect.SignalAspect(parameters=dct)
+json_hook = utils.typeRegistry.objectHook
+"""Hook method for json loading of signal library."""
 
 
+@utils.typeRegistry.register
 class SignalItem(abstract.TrackItem):
     """Logical item for signals.
 
@@ -457,10 +444,9 @@ class SignalItem(abstract.TrackItem):
 
     def setBerthRect(self):
         """Sets the berth graphics item boundingRect."""
-        font = QtGui.QFont("Courier New")
-        font.setPixelSize(11)
-        rect = QtGui.QFontMetricsF(font).boundingRect("XXXXX")
-        self._berthRect = rect
+        self._berthRect = helper.fontMetrics(
+            *helper.BERTH_FONT
+        ).boundingRect("XXXXX")
 
     def isOnPosition(self, p):
         """ Checks that the signalItem is on the position p,
@@ -650,6 +636,10 @@ class SignalItem(abstract.TrackItem):
         isGame = (self.simulation.context == utils.Context.GAME)
         isEditorScenery = \
             (self.simulation.context == utils.Context.EDITOR_SCENERY)
+        if isGame and helper.isLowDetail(p):
+            if itemId == SignalItem.SIGNAL_GRAPHIC_ITEM:
+                self.activeAspect.drawDot(p)
+            return
         linePen = self.getPen()
         shapePen = self.getPen()
         shapePen.setColor(Qt.white)
@@ -666,7 +656,9 @@ class SignalItem(abstract.TrackItem):
 
             persistent = (self.nextActiveRoute is not None and
                           self.nextActiveRoute.persistent)
-            self.activeAspect.drawAspect(p, linePen, shapePen, persistent)
+            self.simulation.signalLibrary.aspectCache.drawAspect(
+                p, self.activeAspect, linePen, shapePen, persistent
+            )
 
             # Draw the connection rects
             if isEditorScenery:
@@ -684,14 +676,12 @@ class SignalItem(abstract.TrackItem):
 
                 shapePen.setColor(Qt.white)
                 p.setPen(shapePen)
-                font = QtGui.QFont("Courier new")
-                font.setPixelSize(11)
-                p.setFont(font)
                 if self.simulation.context == utils.Context.GAME:
                     text = self.trainServiceCode or "*****"
                 else:
                     text = "XXXXX"
-                p.drawText(QtCore.QPointF(0, 0), text.rjust(5))
+                helper.drawText(p, QtCore.QPointF(0, 0), text.rjust(5),
+                                *helper.BERTH_FONT)
 
                 # Draw connection rects
                 if isEditorScenery:
@@ -722,6 +712,7 @@ class SignalItem(abstract.TrackItem):
                 drag.exec_()
 
 
+@utils.typeRegistry.register
 class SignalState:
     """A SignalState is an aspect of a signal with a set of conditions to
     display this aspect."""
@@ -766,6 +757,7 @@ class SignalState:
         return True
 
 
+@utils.typeRegistry.register
 class SignalType:
     """A ``SignalType`` describes a type of signals which can have different
     aspects and the logic for displaying aspects."""
@@ -843,6 +835,7 @@ class SignalType:
             return self.getDefaultAspect()
 
 
+@utils.typeRegistry.register
 class SignalLibrary:
     """A SignalLibrary holds the informations about the signal types and signal
     aspects available in the simulation.
@@ -860,9 +853,11 @@ class SignalLibrary:
         self.signalTypes = parameters["signalTypes"]
         for name, st in self.signalTypes.items():
             st.name = name
+        self.aspectCache = signalaspect.AspectCache()
 
     def initialize(self):
         """Initializes the SignalLibrary once it is totally loaded."""
+        self.aspectCache.clear()
         for st in self.signalTypes.values():
             st.initialize(self)
 
@@ -887,6 +882,7 @@ class SignalLibrary:
         """
         self.signalAspects.update(other.signalAspects)
         self.signalTypes.update(other.signalTypes)
+        self.aspectCache.clear()
 
     @staticmethod
     def createSignalLibrary():
@@ -18,7 +18,7 @@
 #   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
 #
 
-from Qt import QtGui, QtCore, QtWidgets, Qt
+from Qt import QtCore, QtWidgets, Qt
 
 from ts2.scenery import abstract, helper
 from ts2 import utils
@@ -26,9 +26,13 @@ from ts2 import utils
 translate = QtWidgets.qApp.translate
 
 
+@utils.typeRegistry.register
 class TextItem(abstract.TrackItem):
     """A TextItem is a prop to display simple text on the layout
     """
+
+    staticGraphics = True
+
     def __init__(self, parameters):
         """Constructor for the TextItem class"""
         super().__init__(parameters)
@@ -74,11 +78,7 @@ class TextItem(abstract.TrackItem):
 
     def updateBoundingRect(self):
         """Updates the bounding rectangle of the graphics item"""
-        tl = QtGui.QTextLayout(self.text)
-        tl.beginLayout()
-        tl.createLine()
-        tl.endLayout()
-        self._rect = tl.boundingRect()
+        self._rect = helper.textRect(self.text)
 
     def graphicsBoundingRect(self, itemId):
         """This function is called by the owned TrackGraphicsItem to return
@@ -96,8 +96,11 @@ class TextItem(abstract.TrackItem):
         """This function is called by the owned TrackGraphicsItem to paint its
         painter."""
         super().graphicsPaint(p, options, itemId, widget)
+        if self.simulation.context == utils.Context.GAME and \
+                (helper.isLowDetail(p) or self.paintedInStaticLayer()):
+            return
         pen = self.getPen()
         pen.setWidth(0)
         pen.setColor(Qt.white)
         p.setPen(pen)
-        p.drawText(self._rect.bottomLeft(), self.text)
+        helper.drawText(p, self._rect.bottomLeft(), self.text)
@@ -20,15 +20,16 @@
 
 from math import sqrt
 import collections
+import hashlib
+import os
 import zipfile
-import simplejson as json
 
 from Qt import QtCore, QtWidgets
 
 from ts2 import __FILE_FORMAT__
-from ts2 import utils, trains
+from ts2 import utils, trains, binformat, jsonstream, catalogue
 from ts2.routing import route, position
-from ts2.game import logger, scorer
+from ts2.game import logger, scorer, saver, events, notifier
 from ts2.scenery import placeitem, lineitem, platformitem, invisiblelinkitem, \
     enditem, pointsitem, textitem
 from ts2.scenery.signals import signalitem
@@ -50,52 +51,59 @@ BUILTIN_OPTIONS = {
     "defaultSignalVisibility": 100
 }
 
+MAX_TIME_FACTOR = 120
+"""Highest time factor accepted by :meth:`Simulation.setTimeFactor`."""
 
-def json_hook(dct):
-    """Hook method for json.load()."""
-    if not dct.get('__type__'):
-        return dct
-    elif dct['__type__'] == "Simulation":
-        return Simulation(dct['options'], dct['trackItems'], dct['routes'],
-                          dct['trainTypes'], dct['services'], dct['trains'],
-                          dct['messageLogger'])
-    elif dct['__type__'] == "SignalItem":
-        return signalitem.SignalItem(parameters=dct)
-    elif dct['__type__'] == "EndItem":
-        return enditem.EndItem(parameters=dct)
-    elif dct['__type__'] == "InvisibleLinkItem":
-        return invisiblelinkitem.InvisibleLinkItem(parameters=dct)
-    elif dct['__type__'] == "LineItem":
-        return lineitem.LineItem(parameters=dct)
-    elif dct['__type__'] == "Place":
-        return placeitem.Place(parameters=dct)
-    elif dct['__type__'] == "PlatformItem":
-        return platformitem.PlatformItem(parameters=dct)
-    elif dct['__type__'] == "PointsItem":
-        return pointsitem.PointsItem(parameters=dct)
-    elif dct['__type__'] == "TextItem":
-        return textitem.TextItem(parameters=dct)
-    elif dct['__type__'] == "Route":
-        return route.Route(parameters=dct)
-    elif dct['__type__'] == "Position":
-        return position.Position(parameters=dct)
-    elif dct['__type__'] == "TrainType":
-        return trains.TrainType(parameters=dct)
-    elif dct['__type__'] == "Service":
-        return trains.Service(parameters=dct)
-    elif dct['__type__'] == "ServiceLine":
-        return trains.ServiceLine(parameters=dct)
-    elif dct['__type__'] == "Train":
-        return trains.Train(parameters=dct)
-    elif dct['__type__'] == "MessageLogger":
-        return logger.MessageLogger(parameters=dct)
-    elif dct['__type__'] == "Message":
-        return logger.Message(dct)
-    else:
-        raise utils.FormatException(
-            translate("json_hook",
-                      "Unknown __type__ '%s' in JSON file") % dct['__type__']
-        )
+PHYSICS_STEP = 0.5
+"""Longest sub-step in seconds while at least one train is moving. This is the
+step the simulation has always used at time factor 1."""
+
+QUIET_STEP = 5.0
+"""Longest sub-step in seconds when no train is moving. Only train activation
+depends on time in this case, so coarse steps are accurate enough."""
+
+MAX_STEP_DISTANCE = 20.0
+"""Longest distance in metres a train may run during a single sub-step."""
+
+MAX_STEP_SPEED_CHANGE = 0.5
+"""Largest speed change in m/s a train may undergo during a single sub-step
+when braking or accelerating at its standard rate."""
+
+
+json_hook = utils.typeRegistry.objectHook
+"""Hook method for json.load()."""
+
+
+STREAMED_SECTIONS = ("trackItems", "routes", "trainTypes", "services",
+                     "trains")
+"""Sections of the simulation file that are read item by item."""
+
+
+def readSections(jsonStream, registry):
+    """Reads the simulation document from jsonStream incrementally and
+    returns the object built from it by registry.
+
+    The sections listed in STREAMED_SECTIONS are decoded one item at a time,
+    so that neither the whole JSON text nor the whole raw dict tree is held
+    in memory at once.
+
+    :param jsonStream: Text or binary stream of the JSON document
+    :param registry: The :class:`~ts2.utils.TypeRegistry` building the
+                     objects
+    """
+    reader = jsonstream.JsonStreamReader(jsonStream, registry.objectHook)
+    dct = {}
+    for key in reader.members():
+        if key in STREAMED_SECTIONS and reader.peek() == "{":
+            section = collections.OrderedDict()
+            for itemKey in reader.members():
+                section[itemKey] = reader.value()
+            dct[key] = section
+        elif key in STREAMED_SECTIONS and reader.peek() == "[":
+            dct[key] = [reader.value() for _ in reader.elements()]
+        else:
+            dct[key] = reader.value()
+    return registry.objectHook(dct)
 
 
 def load(simulationWindow, jsonStream):
@@ -103,12 +111,14 @@ def load(simulationWindow, jsonStream):
 
     The logic of loading is the following:
 
-    1. We create the graph of objects from ``json.load()``. When initialized,
-       each object stores its JSON data.
+    1. We create the graph of objects section by section with
+       :func:`readSections`. When initialized, each object stores its JSON
+       data.
     2. When all the objects are created, we call the
        :meth:`~ts2.simulation.Simulation.initialize` method of the
        :class:`~ts2.simulation.Simulation` which calls in turn the
-       ``initialize()`` method of each object.
+       ``initialize()`` method of each object. Each object drops its JSON
+       data once initialized.
 
     This method will create all the missing links between the object and the
     simulation (and other objects).
@@ -116,7 +126,25 @@ def load(simulationWindow, jsonStream):
     :param simulationWindow:
     :param jsonStream:
     """
-    simulation = json.load(jsonStream, object_hook=json_hook, encoding='utf-8')
+    simulation = readSections(jsonStream, utils.typeRegistry)
+    if not isinstance(simulation, Simulation):
+        raise utils.FormatException(
+            translate("simulation.load", "Loaded file is not a TS2 simulation")
+        )
+    simulation.initialize(simulationWindow)
+    return simulation
+
+
+def loadBinary(simulationWindow, binaryStream):
+    """Loads the simulation from binaryStream, which is in the
+    :mod:`~ts2.binformat` format, and returns it.
+
+    The logic of loading is the same as :func:`load`.
+
+    :param simulationWindow:
+    :param binaryStream:
+    """
+    simulation = binformat.loads(binaryStream.read(), utils.typeRegistry)
     if not isinstance(simulation, Simulation):
         raise utils.FormatException(
             translate("simulation.load", "Loaded file is not a TS2 simulation")
@@ -125,9 +153,127 @@ def load(simulationWindow, jsonStream):
     return simulation
 
 
+def fileHash(fileName):
+    """
+    :return: the SHA-256 hex digest of the content of fileName, which
+             identifies the base simulation of delta saves.
+    """
+    digest = hashlib.sha256()
+    with open(fileName, "rb") as file:
+        for chunk in iter(lambda: file.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def readFile(fileName, registry=utils.typeRegistry):
+    """Reads the simulation file fileName, whatever its format, and returns
+    the object built from it by registry, not yet initialized.
+
+    :param str fileName: Path of a .ts2 or .tsg archive, or of a JSON file
+    :param registry: The :class:`~ts2.utils.TypeRegistry` building the
+                     objects
+    """
+    if zipfile.is_zipfile(fileName):
+        with zipfile.ZipFile(fileName) as zipArchive:
+            if binformat.MEMBER_NAME in zipArchive.namelist():
+                with zipArchive.open(binformat.MEMBER_NAME) as file:
+                    return binformat.loads(file.read(), registry)
+            with zipArchive.open("simulation.json") as file:
+                return readSections(file, registry)
+    with open(fileName) as file:
+        return readSections(file, registry)
+
+
+def isSavedGame(fileName):
+    """
+    :return: True if fileName is a game written by
+             :meth:`Simulation.saveGame` or by the autosave, i.e. an archive
+             in the :mod:`~ts2.binformat` format. Such files may be
+             overwritten by later saves, so that they are not used as the
+             base of delta saves.
+    """
+    if not zipfile.is_zipfile(fileName):
+        return False
+    with zipfile.ZipFile(fileName) as zipArchive:
+        return binformat.MEMBER_NAME in zipArchive.namelist()
+
+
+def findBase(delta, fileName):
+    """Finds the base simulation file of a delta save.
+
+    The base is looked up at its saved path, then under its file name in the
+    directory of the delta save and in the simulations directory. The first
+    file having the content hash stored in the delta save is returned.
+
+    :param dict delta: The delta save, as built by
+                       :meth:`Simulation.deltaJson`
+    :param str fileName: Path of the delta save
+    """
+    baseFile = delta["base"]["fileName"]
+    baseName = os.path.basename(baseFile)
+    candidates = [
+        baseFile,
+        os.path.join(os.path.dirname(os.path.abspath(fileName)), baseName),
+        os.path.join(utils.settings.simulationsDir, baseName)
+    ]
+    for candidate in candidates:
+        if os.path.isfile(candidate) and \
+                fileHash(candidate) == delta["base"]["sha256"]:
+            return candidate
+    raise utils.FormatException(
+        translate("simulation.load",
+                  "The base simulation %s of this saved game is missing or "
+                  "has been modified") % baseFile
+    )
+
+
+def loadFile(simulationWindow, fileName, registry=utils.typeRegistry):
+    """Loads the simulation file fileName, whatever its format, and returns
+    it.
+
+    Delta saves are applied on top of their base simulation, which is
+    loaded first. The loaded simulation records the path and content hash
+    of its base file, so that it can itself be saved as a delta, unless the
+    base file is a saved game.
+
+    :param simulationWindow:
+    :param str fileName: Path of the file to load
+    :param registry: The :class:`~ts2.utils.TypeRegistry` building the
+                     objects, e.g. the one of the editor
+    """
+    simulation = readFile(fileName, registry)
+    if isinstance(simulation, dict) and \
+            simulation.get("__type__") == "SimulationDelta":
+        delta = simulation
+        baseFile = findBase(delta, fileName)
+        simulation = readFile(baseFile, registry)
+        if isinstance(simulation, Simulation):
+            simulation.applyDelta(delta)
+    else:
+        baseFile = fileName
+    if not isinstance(simulation, Simulation):
+        raise utils.FormatException(
+            translate("simulation.load", "Loaded file is not a TS2 simulation")
+        )
+    if not isSavedGame(baseFile):
+        simulation.baseFile = os.path.abspath(baseFile)
+        simulation.baseHash = fileHash(baseFile)
+    simulation.initialize(simulationWindow)
+    return simulation
+
+
 class Simulation(QtCore.QObject):
     """The ``Simulation`` class holds all the game logic."""
 
+    STATIC_SECTIONS = ("trackItems", "trainTypes", "services")
+    """Sections of the simulation file that do not change while a game is
+    played."""
+
+    MUTABLE_SECTIONS = ("__type__", "options", "routes", "trains",
+                        "messageLogger")
+    """Sections of the simulation file that hold the state of a running
+    game."""
+
     def __init__(self, options, trackItems, routes, trainTypes, services,
                  trns, messageLogger):
         """
@@ -142,6 +288,9 @@ class Simulation(QtCore.QObject):
         super().__init__()
         self.simulationWindow = None
         self._scene = QtWidgets.QGraphicsScene()
+        self.trainLinePool = lineitem.TrainLinePool(self)
+        self.staticLayer = None
+        self.notifier = notifier.ModelNotifier(self)
         self._timer = QtCore.QTimer(self)
         self._messageLogger = messageLogger
         self._scorer = scorer.Scorer(self)
@@ -161,10 +310,19 @@ class Simulation(QtCore.QObject):
         self._services = collections.OrderedDict()
         self._services.update(services)
         self._places = collections.OrderedDict()
+        self._lineItems = {}
         self._trains = trns
+        self.baseFile = None
+        self.baseHash = None
+        self.eventRecorder = None
+        self._staticState = None
         self.signalLibrary = signalitem.signalLibrary
-        self._time = QtCore.QTime()
-        self._startTime = QtCore.QTime()
+        self._time = 0.0
+        self._startTime = 0
+        self._dirtyItems = None
+        self._invalidations = 0
+        self._refreshes = 0
+        self.savedInvalidations = 0
         self._serviceListModel = trains.ServiceListModel(self)
         self._selectedServiceModel = trains.ServiceInfoModel(self)
         self._trainListModel = trains.TrainListModel(self)
@@ -190,6 +348,13 @@ class Simulation(QtCore.QObject):
                 self.tr("Invalid simulation: Not all items are linked.")
             )
 
+        if self.context == utils.Context.GAME:
+            self.registerGraphicsItem(lineitem.LineOverviewItem(self, [
+                ti for ti in self._trackItems.values()
+                if isinstance(ti, lineitem.LineItem) and
+                not isinstance(ti, invisiblelinkitem.InvisibleLinkItem)
+            ]))
+
         for rte in self.routes.values():
             rte.initialize(self)
         for rte in self.routes.values():
@@ -200,6 +365,12 @@ class Simulation(QtCore.QObject):
             ti.setupTriggers()
         for trainType in self.trainTypes.values():
             trainType.initialize(self)
+        # The start time is needed to read the timetables
+        self._startTime = utils.timeFromString(self.option("currentTime"))
+        if self._startTime is None:
+            self._startTime = utils.timeFromString(
+                BUILTIN_OPTIONS["currentTime"]
+            )
         for service in self.services.values():
             service.initialize(self)
         for train in self.trains:
@@ -211,9 +382,7 @@ class Simulation(QtCore.QObject):
         self.messageLogger.initialize(self)
 
         self._scene.update()
-        self._startTime = QtCore.QTime.fromString(self.option("currentTime"),
-                                                  "hh:mm:ss")
-        self._time = self._startTime
+        self._time = float(self._startTime)
         self._timer.timeout.connect(self.timerOut)
         interval = 500
         self._timer.setInterval(interval)
@@ -222,17 +391,34 @@ class Simulation(QtCore.QObject):
         self.messageLogger.addMessage(self.tr("Simulation loaded"),
                                       logger.Message.SOFTWARE_MSG)
 
-    def for_json(self):
-        """Dumps the simulation to JSON."""
+    def savedOptions(self):
+        """
+        :return: the simulation options as they are saved, i.e. with the
+                 current time and score when in game.
+        :rtype: dict
+        """
         savedOptions = self._options.copy()
         if self.context == utils.Context.GAME:
             savedOptions.update({
-                "currentTime": self.currentTime.toString("hh:mm:ss"),
+                "currentTime": utils.timeToString(self.currentTime),
                 "currentScore": self.scorer.score
             })
+        return savedOptions
+
+    def metadata(self):
+        """
+        :return: the metadata of the simulation, written uncompressed in .ts2
+                 archives. See :func:`ts2.catalogue.metadata`.
+        :rtype: dict
+        """
+        return catalogue.metadata(self.savedOptions(), self.trackItems,
+                                  self.routes, self.services, self.trains)
+
+    def for_json(self):
+        """Dumps the simulation to JSON."""
         return {
             "__type__": "Simulation",
-            "options": savedOptions,
+            "options": self.savedOptions(),
             "trackItems": self.trackItems,
             "routes": self.routes,
             "trainTypes": self.trainTypes,
@@ -241,20 +427,167 @@ class Simulation(QtCore.QObject):
             "messageLogger": self.messageLogger
         }
 
+    def deltaJson(self):
+        """Dumps the state of the game to JSON as changes to the base file
+        of the simulation, i.e. the file it was loaded from.
+
+        Only the options, the state of the routes, the trains and the
+        messages are dumped, along with the path and the content hash of
+        the base file. See :meth:`applyDelta`."""
+        return {
+            "__type__": "SimulationDelta",
+            "base": {
+                "fileName": self.baseFile,
+                "sha256": self.baseHash
+            },
+            "options": self.savedOptions(),
+            "routeStates": {routeNum: rte.getRouteState()
+                            for routeNum, rte in self.routes.items()},
+            "trains": self.trains,
+            "messageLogger": self.messageLogger
+        }
+
+    def applyDelta(self, delta):
+        """Replaces the state of this simulation, which must not be
+        initialized yet, by the state saved in delta.
+
+        :param dict delta: The data dumped by :meth:`deltaJson`
+        """
+        self._options.update(delta["options"])
+        for routeNum, state in delta["routeStates"].items():
+            rte = self._routes.get(int(routeNum))
+            if rte is not None:
+                rte.initialState = state
+        self._trains = delta["trains"]
+        self._messageLogger = delta["messageLogger"]
+
+    def captureState(self, sections=None):
+        """
+        :param sections: Keys of the sections of the simulation file to
+                         capture, e.g. MUTABLE_SECTIONS. All sections are
+                         captured if None.
+        :return: a copy of the simulation made only of plain data, as given
+                 by :func:`ts2.utils.snapshot`. It can be serialised in
+                 another thread while the simulation keeps running.
+        """
+        if sections is None:
+            return utils.snapshot(self)
+        data = self.for_json()
+        return {key: utils.snapshot(data[key]) for key in sections}
+
+    def staticState(self):
+        """
+        :return: the STATIC_SECTIONS of the simulation, captured the first
+                 time they are needed and then encoded by the first
+                 :class:`~ts2.game.saver.SaveWorker` writing them. The dict
+                 is shared by all the saves and must not be modified.
+        :rtype: dict
+        """
+        if self._staticState is None:
+            self._staticState = self.captureState(self.STATIC_SECTIONS)
+        return self._staticState
+
+    @QtCore.pyqtSlot(object)
+    def setStaticState(self, staticState):
+        """Replaces the static sections returned by :meth:`staticState`,
+        e.g. by their encoded value.
+
+        :param dict staticState: The static sections
+        """
+        self._staticState = staticState
+
     def saveGame(self, fileName):
-        """Saves the game.
+        """Saves the game in the compact :mod:`~ts2.binformat` format.
+
+        If the save mode setting is "delta" and the simulation has a base
+        file, only the state of the game is saved, as given by
+        :meth:`deltaJson`. The game is saved in full if fileName is the
+        base file, which a delta save must not overwrite.
+
+        Only the mutable sections of the simulation are captured in the
+        calling thread. They are encoded, along with the static sections
+        given by :meth:`staticState`, then compressed and written atomically
+        by a :class:`~ts2.game.saver.SaveWorker` thread while the simulation
+        keeps running. saveStarted is emitted when saving starts, and then
+        either saved or saveFailed.
 
         :param str fileName:  fileName to write"""
-        self.pause()
         self.messageLogger.addMessage(self.tr("Saving simulation"),
                                       logger.Message.SOFTWARE_MSG)
-        with zipfile.ZipFile(fileName, "w") as zipArchive:
-            zipArchive.writestr("simulation.json",
-                                json.dumps(self, separators=(',', ':'),
-                                           for_json=True, encoding='utf-8'),
-                                compress_type=zipfile.ZIP_BZIP2)
+        compressType, level = utils.settings.archiveCompression()
+        if utils.settings.saveMode() == "delta" and \
+                self.baseHash is not None and \
+                not self.isBaseFile(fileName):
+            state = utils.snapshot(self.deltaJson())
+            static = None
+        else:
+            state = self.captureState(self.MUTABLE_SECTIONS)
+            static = self.staticState()
+        worker = saver.SaveWorker(fileName, state, self.metadata(),
+                                  compressType, level, static)
+        worker.staticEncoded.connect(self.setStaticState)
+        worker.saved.connect(self.onGameSaved)
+        worker.failed.connect(self.onGameSaveFailed)
+        self.saveStarted.emit(fileName)
+        worker.start()
+
+    def isBaseFile(self, fileName):
+        """
+        :return: True if fileName is the base file of the simulation
+        """
+        if self.baseFile is None:
+            return False
+        if os.path.abspath(fileName) == self.baseFile:
+            return True
+        try:
+            return os.path.samefile(fileName, self.baseFile)
+        except OSError:
+            return False
+
+    def recordEvents(self, fileName):
+        """Starts recording the events of the game to fileName with an
+        :class:`~ts2.game.events.EventRecorder`.
+
+        :param str fileName: Path of the events file"""
+        self.stopRecordingEvents()
+        self.eventRecorder = events.EventRecorder(fileName)
+
+    def stopRecordingEvents(self):
+        """Stops recording events and closes the events file, if any."""
+        if self.eventRecorder is not None:
+            self.eventRecorder.close()
+            self.eventRecorder = None
+
+    def close(self):
+        """Closes the files held by the simulation, i.e. the events file
+        and the spill file of the message logger. To be called when the
+        simulation is closed."""
+        self.stopRecordingEvents()
+        self.messageLogger.close()
+
+    def recordEvent(self, eventType, trainId, place="", value1=float("nan"),
+                    value2=float("nan")):
+        """Records an event at the current time if events are being
+        recorded. See :meth:`ts2.game.events.EventRecorder.record`."""
+        if self.eventRecorder is not None:
+            self.eventRecorder.record(
+                eventType, self._time,
+                trainId, place, value1, value2
+            )
+
+    @QtCore.pyqtSlot(str)
+    def onGameSaved(self, fileName):
         self.messageLogger.addMessage(self.tr("Simulation saved"),
                                       logger.Message.SOFTWARE_MSG)
+        self.saved.emit(fileName)
+
+    @QtCore.pyqtSlot(str, str)
+    def onGameSaveFailed(self, fileName, error):
+        self.messageLogger.addMessage(
+            self.tr("Error while saving simulation: %s") % error,
+            logger.Message.SOFTWARE_MSG
+        )
+        self.saveFailed.emit(fileName, error)
 
     @property
     def scene(self):
@@ -303,16 +636,18 @@ class Simulation(QtCore.QObject):
     @property
     def startTime(self):
         """
-        :return: the time at which the simulation starts.
-        :rtype: ``QtCore.QTime``
+        :return: the time at which the simulation starts, in seconds from
+                 the sim epoch. See :func:`ts2.utils.timeFromString`.
+        :rtype: int
         """
         return self._startTime
 
     @property
     def currentTime(self):
         """
-        :return: the current sim time
-        :rtype: ``QtCore.QTime``
+        :return: the current sim time, in seconds from the sim epoch. See
+                 :func:`ts2.utils.timeFromString`.
+        :rtype: float
         """
         return self._time
 
@@ -445,11 +780,11 @@ class Simulation(QtCore.QObject):
     """pyqtSignal(:class:`~ts2.scenery.signals.signalitem.SignalItem`,
     :class:`~ts2.scenery.signals.signalitem.SignalItem`)"""
 
-    timeChanged = QtCore.pyqtSignal(QtCore.QTime)
-    """pyqtSignal(QtCore.QTime)"""
+    timeChanged = QtCore.pyqtSignal(float)
+    """pyqtSignal(float) with the current time in seconds"""
 
     timeElapsed = QtCore.pyqtSignal(float)
-    """pyqtSignal(float)"""
+    """pyqtSignal(float) with the sim time elapsed in the tick in seconds"""
 
     trainSelected = QtCore.pyqtSignal(int)
     """pyqtSignal(int)"""
@@ -460,6 +795,15 @@ class Simulation(QtCore.QObject):
     selectionChanged = QtCore.pyqtSignal()
     """pyqtSignal()"""
 
+    saveStarted = QtCore.pyqtSignal(str)
+    """pyqtSignal(str) with the file name"""
+
+    saved = QtCore.pyqtSignal(str)
+    """pyqtSignal(str) with the file name"""
+
+    saveFailed = QtCore.pyqtSignal(str, str)
+    """pyqtSignal(str, str) with the file name and the error message"""
+
     @QtCore.pyqtSlot(int)
     def updateContext(self, tabNum):
         """Updates the context of the simulation. Does nothing in the base
@@ -563,7 +907,7 @@ class Simulation(QtCore.QObject):
         :param int timeFactor: Sets the time factor to timeFactor.
         """
         self._timer.stop()
-        self.setOption("timeFactor", min(timeFactor, 10))
+        self.setOption("timeFactor", min(timeFactor, MAX_TIME_FACTOR))
         if timeFactor != 0:
             self._timer.start()
 
@@ -571,12 +915,110 @@ class Simulation(QtCore.QObject):
     def timerOut(self):
         """ Changes the simulation time and emits the timeChanged and the
         timeElapsed signals
+        The elapsed time is split into sub-steps given by physicsStep() so
+        that high time factors do not degrade train physics, while the
+        signals are emitted once per tick.
         This function is normally connected to the timer timeout signal."""
         timeFactor = float(self.option("timeFactor"))
-        self._time = self._time.addMSecs((self._timer.interval()) * timeFactor)
+        self.advance(round(self._timer.interval() * timeFactor))
+
+    def advance(self, msecs):
+        """Advances the simulation by msecs milliseconds of sim time, in
+        physics sub-steps, as one tick. Called by :meth:`timerOut`, or
+        directly to run the simulation at full speed without the timer.
+
+        Only the trains are stepped inside the tick. The timeChanged and
+        timeElapsed signals are emitted once the tick is over."""
+        remaining = msecs
+        self._dirtyItems = {}
+        self._invalidations = 0
+        self._refreshes = 0
+        try:
+            firstStep = True
+            while remaining > 0:
+                step = min(remaining,
+                           round(self.physicsStep(firstStep) * 1000))
+                firstStep = False
+                remaining -= step
+                self._time += step / 1000
+                self.trainsStep(step / 1000)
+        finally:
+            self.flushGraphics()
+            self._dirtyItems = None
+            self.savedInvalidations = self._invalidations - self._refreshes
         self.timeChanged.emit(self._time)
-        secs = self._timer.interval() * timeFactor / 1000
-        self.timeElapsed.emit(secs)
+        self.timeElapsed.emit(msecs / 1000)
+
+    def trainsStep(self, secs):
+        """Runs one physics sub-step of secs seconds ending at the current
+        time: activates the trains which appear, then advances all the
+        trains."""
+        for train in self._trains:
+            train.activate(self._time)
+        for train in self._trains:
+            train.advance(secs)
+
+    def markDirty(self, trackItem):
+        """Marks the graphics of trackItem for update at the end of the
+        current tick.
+
+        :return: True if the update is deferred, False if the simulation is
+                 not advancing, in which case the caller must update its
+                 graphics itself.
+        """
+        if self._dirtyItems is None:
+            return False
+        self._invalidations += 1
+        # TrackItem defines __eq__ but is not hashable
+        self._dirtyItems[id(trackItem)] = trackItem
+        return True
+
+    def flushGraphics(self):
+        """Updates now the graphics of the track items marked dirty in the
+        current tick. This is done at the end of each tick, and must be done
+        by whatever reads the scene in the middle of a tick. After the tick,
+        savedInvalidations holds the number of redundant updates that were
+        coalesced."""
+        if not self._dirtyItems:
+            return
+        dirtyItems = self._dirtyItems
+        self._dirtyItems = {}
+        for trackItem in dirtyItems.values():
+            trackItem.refreshGraphics()
+        self._refreshes += len(dirtyItems)
+
+    def physicsStep(self, firstStep=False):
+        """Returns the length in seconds of the next physics sub-step.
+
+        The step is sized for the most demanding train: no moving train may
+        run more than MAX_STEP_DISTANCE metres or change its speed by more
+        than MAX_STEP_SPEED_CHANGE during one step. Trains which may start
+        moving during the step, because they enter the area, depart from a
+        station or can accelerate from standstill, limit the step to
+        PHYSICS_STEP, so that their first move is not a coarse one. When no
+        train is moving nor about to move, the step falls back to
+        QUIET_STEP.
+
+        Trains waiting at standstill, e.g. at a red signal, can only start
+        once the player or another train has cleared their way. They only
+        limit the first step of a tick, which follows the player's actions,
+        since moving trains already limit the other steps.
+
+        :param bool firstStep: True for the first sub-step of a tick
+        """
+        step = QUIET_STEP
+        for train in self._trains:
+            if train.isActive() and train.speed > 0:
+                step = min(step, PHYSICS_STEP,
+                           MAX_STEP_DISTANCE / train.speed)
+                # The editor accepts train types without braking
+                if train.trainType.stdBraking > 0:
+                    step = min(step, MAX_STEP_SPEED_CHANGE /
+                               train.trainType.stdBraking)
+            elif train.mayStartMoving(QUIET_STEP) and \
+                    (firstStep or train.status != trains.TrainStatus.WAITING):
+                step = min(step, PHYSICS_STEP)
+        return max(step, 0.1)
 
     def updateSelection(self):
         """Updates the trackItem selection. Does nothing in the base
@@ -687,8 +1129,49 @@ class Simulation(QtCore.QObject):
         :return: the :class:`~ts2.scenery.lineitem.LineItem` instance defined by
         placeCode and trackCode.
         """
+        return self._lineItems.get((placeCode, trackCode))
+
+    def indexLineItem(self, lineItem, oldKey=None):
+        """Updates the index used by :meth:`getLineItem` for lineItem.
+
+        Line items that belong to a place are indexed by their (placeCode,
+        trackCode) key. If several line items have the same key, the first
+        indexed one is returned by :meth:`getLineItem`.
+
+        :param lineItem: The :class:`~ts2.scenery.lineitem.LineItem`
+        :param oldKey: The previous (placeCode, trackCode) key of lineItem,
+                       if it has changed.
+        """
+        if oldKey is not None and self._lineItems.get(oldKey) is lineItem:
+            del self._lineItems[oldKey]
+            self._reindexLineItems(oldKey)
+        if lineItem.place is not None:
+            self._lineItems.setdefault(
+                (lineItem.placeCode, lineItem.trackCode), lineItem
+            )
+
+    def unindexLineItem(self, lineItem):
+        """Removes lineItem from the index used by :meth:`getLineItem`."""
+        key = (lineItem.placeCode, lineItem.trackCode)
+        if self._lineItems.get(key) is lineItem:
+            del self._lineItems[key]
+            self._reindexLineItems(key, lineItem)
+
+    def _reindexLineItems(self, key, removedItem=None):
+        """Indexes under key another line item having this key, if any."""
         for ti in self._trackItems.values():
-            if isinstance(ti, lineitem.LineItem):
-                if ti.placeCode == placeCode and ti.trackCode == trackCode:
-                    return ti
-        return None
+            if isinstance(ti, lineitem.LineItem) and ti is not removedItem \
+                    and ti.place is not None \
+                    and (ti.placeCode, ti.trackCode) == key:
+                self._lineItems[key] = ti
+                return
+
+
+utils.typeRegistry.registerFactory("SimulationDelta", lambda dct: dct)
+
+utils.typeRegistry.registerFactory(
+    "Simulation",
+    lambda dct: Simulation(dct['options'], dct['trackItems'], dct['routes'],
+                           dct['trainTypes'], dct['services'], dct['trains'],
+                           dct['messageLogger'])
+)
@@ -57,15 +57,15 @@ class ServiceInfoModel(QtCore.QAbstractTableModel):
                 return line.trackCode
             elif index.column() == 2:
                 if line.mustStop:
-                    return line.scheduledArrivalTime
+                    return line.scheduledArrivalTimeStr
                 else:
                     return self.tr("Non-stop")
             elif index.column() == 3:
                 if line.mustStop:
-                    return line.scheduledDepartureTime
+                    return line.scheduledDepartureTimeStr
                 else:
-                    return line.scheduledDepartureTime or \
-                           line.scheduledArrivalTime
+                    return line.scheduledDepartureTimeStr or \
+                           line.scheduledArrivalTimeStr
         return None
 
     def headerData(self, column, orientation, role=Qt.DisplayRole):
@@ -131,7 +131,7 @@ class ServiceListModel(QtCore.QAbstractTableModel):
             if index.column() == 0:
                 return service.serviceCode
             elif index.column() == 1:
-                return service.lines[0].scheduledDepartureTime
+                return service.lines[0].scheduledDepartureTimeStr
             elif index.column() == 2:
                 return service.description
             elif index.column() == 3:
@@ -178,12 +178,28 @@ class ServicesModel(QtCore.QAbstractTableModel):
         """Constructor for the ServicesModel class"""
         super().__init__(editor)
         self._editor = editor
+        self._services = None
+        self.modelReset.connect(self.clearCache)
+        self.rowsInserted.connect(self.clearCache)
+        self.rowsRemoved.connect(self.clearCache)
 
     @property
     def simulation(self):
         """Returns the simulation this model belongs to."""
         return self._editor
 
+    @QtCore.pyqtSlot()
+    def clearCache(self):
+        """Drops the cached list of services, which is rebuilt on next
+        access."""
+        self._services = None
+
+    def service(self, row):
+        """Returns the service displayed at row."""
+        if self._services is None:
+            self._services = list(self._editor.services.values())
+        return self._services[row]
+
     def rowCount(self, parent=None, *args, **kwargs):
         """Returns the number of rows of the model, corresponding to the
         number of services of the editor"""
@@ -197,7 +213,7 @@ class ServicesModel(QtCore.QAbstractTableModel):
         """Returns the data at the given index"""
         if role == Qt.DisplayRole or role == Qt.EditRole:
 
-            service = list(self._editor.services.values())[index.row()]
+            service = self.service(index.row())
 
             if index.column() == self.C.serviceCode:
                 return str(service.serviceCode)
@@ -271,6 +287,7 @@ class ServicesModel(QtCore.QAbstractTableModel):
         return flags
 
 
+@utils.typeRegistry.register
 class ServiceLine:
     """ A serviceLine is a line of the definition of the service.
     It consists of a place (usually a station) with a track number
@@ -280,9 +297,9 @@ class ServiceLine:
         """Constructor for the ServiceLine class"""
         self._placeCode = parameters["placeCode"]
         self._scheduledArrivalTime = \
-            QtCore.QTime.fromString(parameters["scheduledArrivalTime"])
+            utils.timeFromString(parameters["scheduledArrivalTime"])
         self._scheduledDepartureTime = \
-            QtCore.QTime.fromString(parameters["scheduledDepartureTime"])
+            utils.timeFromString(parameters["scheduledDepartureTime"])
         self._trackCode = parameters["trackCode"]
         self._stop = int(parameters["mustStop"])
         self._service = None
@@ -292,6 +309,14 @@ class ServiceLine:
         """Initialize the serviceLine for the given service."""
         self._service = service
         self.simulation = service.simulation
+        if self.simulation.context == utils.Context.GAME:
+            startTime = self.simulation.startTime
+            self._scheduledArrivalTime = utils.nextDayTime(
+                self._scheduledArrivalTime, startTime
+            )
+            self._scheduledDepartureTime = utils.nextDayTime(
+                self._scheduledDepartureTime, startTime
+            )
 
     def for_json(self):
         """Dumps this service line to JSON."""
@@ -351,38 +376,38 @@ class ServiceLine:
     @property
     def scheduledDepartureTime(self):
         """Returns the scheduled departure time of this service at the place
-        of this ServiceLine, as a QTime"""
+        of this ServiceLine, in seconds, or None if there is none"""
         return self._scheduledDepartureTime
 
     @property
     def scheduledDepartureTimeStr(self):
         """Returns the scheduled departure time of this service at the place
         of this ServiceLine, as a string"""
-        return self._scheduledDepartureTime.toString("HH:mm:ss")
+        return utils.timeToString(self._scheduledDepartureTime)
 
     @scheduledDepartureTimeStr.setter
     def scheduledDepartureTimeStr(self, value):
         """Setter function for the scheduledDepartureTime property"""
         if self.simulation.context == utils.Context.EDITOR_SERVICES:
-            self._scheduledDepartureTime = QtCore.QTime.fromString(value)
+            self._scheduledDepartureTime = utils.timeFromString(value)
 
     @property
     def scheduledArrivalTime(self):
         """Returns the scheduled arrival time of this service at the place
-        of this ServiceLine, as a QTime"""
+        of this ServiceLine, in seconds, or None if there is none"""
         return self._scheduledArrivalTime
 
     @property
     def scheduledArrivalTimeStr(self):
         """Returns the scheduled arrival time of this service at the place
         of this ServiceLine as a string"""
-        return self._scheduledArrivalTime.toString("HH:mm:ss")
+        return utils.timeToString(self._scheduledArrivalTime)
 
     @scheduledArrivalTimeStr.setter
     def scheduledArrivalTimeStr(self, value):
         """Setter function for the scheduledArrivalTime property"""
         if self.simulation.context == utils.Context.EDITOR_SERVICES:
-            self._scheduledArrivalTime = QtCore.QTime.fromString(value)
+            self._scheduledArrivalTime = utils.timeFromString(value)
 
     def __eq__(self, other):
         """Equal operator"""
@@ -491,6 +516,7 @@ class ServiceLinesModel(QtCore.QAbstractTableModel):
         return self._editor
 
 
+@utils.typeRegistry.register
 class Service:
     """A Service is mainly a predefined schedule that trains are supposed to
     follow with a few additional informations.
@@ -21,6 +21,7 @@ from math import sqrt
 
 from Qt import QtCore, QtGui, QtWidgets, Qt
 from ts2 import utils
+from ts2.game import events
 from ts2.routing import position
 from ts2.scenery import lineitem, enditem
 from ts2.scenery.signals import signalaspect, signalitem
@@ -120,13 +121,27 @@ class TrainListModel(QtCore.QAbstractTableModel):
                 return line.trackCode
             elif index.column() == 6 and line is not None:
                 if line.mustStop:
-                    return line.scheduledArrivalTime.toString("hh:mm:ss")
+                    return line.scheduledArrivalTimeStr
                 else:
                     return self.tr("Non-stop")
             elif index.column() == 7 and line is not None:
-                return line.scheduledDepartureTime.toString("hh:mm:ss")
+                return line.scheduledDepartureTimeStr
             else:
                 return ""
+        elif role == Qt.UserRole:
+            # Sort keys
+            if index.column() == 1:
+                return train.status
+            elif index.column() in (6, 7):
+                if line is None:
+                    return -1
+                elif index.column() == 7:
+                    return utils.timeSortKey(line.scheduledDepartureTime)
+                elif line.mustStop:
+                    return utils.timeSortKey(line.scheduledArrivalTime)
+                else:
+                    return -1
+            return self.data(index, Qt.DisplayRole)
         elif role == Qt.ForegroundRole:
             if train.status == TrainStatus.RUNNING:
                 return QtGui.QBrush(Qt.darkGreen)
@@ -167,9 +182,9 @@ class TrainListModel(QtCore.QAbstractTableModel):
 
     @QtCore.pyqtSlot(int)
     def update(self, trainId):
-        """Emits the dataChanged signal for the train defined by trainId."""
-        row = trainId
-        self.dataChanged.emit(self.index(row, 0), self.index(row, 7))
+        """Notifies the change of the train defined by trainId at the next
+        frame."""
+        self.simulation.notifier.rowChanged(self, trainId)
 
 
 class TrainsModel(QtCore.QAbstractTableModel):
@@ -347,13 +362,11 @@ class TrainInfoModel(QtCore.QAbstractTableModel):
                         return line.trackCode
                     elif index.row() == 10 and line is not None:
                         if line.mustStop:
-                            return \
-                                line.scheduledArrivalTime.toString("hh:mm:ss")
+                            return line.scheduledArrivalTimeStr
                         else:
                             return self.tr("Non-stop")
                     elif index.row() == 11 and line is not None:
-                        return \
-                            line.scheduledDepartureTime.toString("hh:mm:ss")
+                        return line.scheduledDepartureTimeStr
                     else:
                         return ""
             elif role == Qt.ForegroundRole:
@@ -401,16 +414,17 @@ class TrainInfoModel(QtCore.QAbstractTableModel):
 
     @QtCore.pyqtSlot()
     def update(self):
-        """Emits the dataChanged signal for the lines that may change."""
-        self.dataChanged.emit(self.index(1, 1), self.index(2, 1))
-        self.dataChanged.emit(self.index(8, 1), self.index(11, 1))
+        """Notifies the change of the lines that may change at the next
+        frame."""
+        self.simulation.notifier.cellsChanged(self, 1, 1, 11, 1)
 
     @QtCore.pyqtSlot()
     def updateSpeed(self):
-        """Emits the dataChanged signal for the speed only."""
-        self.dataChanged.emit(self.index(2, 1), self.index(2, 1))
+        """Notifies the change of the speed only at the next frame."""
+        self.simulation.notifier.cellsChanged(self, 2, 1)
 
 
+@utils.typeRegistry.register
 class Train(QtCore.QObject):
     """A ``Train`` is a stock running on a track at a certain speed and to which
        is assigned a :class:`~ts2.trains.service.Service` .
@@ -433,7 +447,7 @@ class Train(QtCore.QObject):
         self._lastSignal = None
         self._signalActions = [(0, 999)]
         self._applicableActionIndex = 0
-        self._actionTime = 0
+        self._actionTime = None
         self._nextPlaceIndex = None
         self._stoppedTime = 0
         if "stoppedTime" in parameters:
@@ -442,7 +456,7 @@ class Train(QtCore.QObject):
         self._initialDelayProba = \
             utils.DurationProba(parameters["initialDelay"])
         self._initialDelay = 0
-        self._appearTime = QtCore.QTime.fromString(parameters["appearTime"])
+        self._appearTime = utils.timeFromString(parameters["appearTime"])
         self._shunting = False
         # FIXME Throw back all these actions to MainWindow
         self.assignAction = QtWidgets.QAction(self.tr("Reassign service..."),
@@ -467,24 +481,25 @@ class Train(QtCore.QObject):
         self._trainType = simulation.trainTypes[params["trainTypeCode"]]
         self.trainHead.initialize(simulation)
         if self.simulation.context == utils.Context.GAME:
+            self._appearTime = utils.nextDayTime(self._appearTime,
+                                                 simulation.startTime)
             if self.currentService is not None:
                 self._nextPlaceIndex = params.get('nextPlaceIndex')
             self.setInitialDelay()
             self.updateMinimumStopTime()
             self.activate(simulation.currentTime)
-            self.simulation.timeElapsed.connect(self.advance)
-            self.simulation.timeChanged.connect(self.activate)
             self.trainStatusChanged.connect(simulation.trainStatusChanged)
             self.trainStoppedAtStation.connect(
                 simulation.scorer.trainArrivedAtStation
             )
             self.trainExitedArea.connect(simulation.scorer.trainExitedArea)
-            self.reassignServiceRequested.connect(
-                simulation.simulationWindow.openReassignServiceWindow
-            )
-            self.splitTrainRequested.connect(
-                simulation.simulationWindow.openSplitTrainWindow
-            )
+            if simulation.simulationWindow is not None:
+                self.reassignServiceRequested.connect(
+                    simulation.simulationWindow.openReassignServiceWindow
+                )
+                self.splitTrainRequested.connect(
+                    simulation.simulationWindow.openSplitTrainWindow
+                )
         self._parameters = None
 
     def for_json(self):
@@ -500,7 +515,7 @@ class Train(QtCore.QObject):
             initialDelay = 0
         else:
             speed = self.speed
-            appearTime = self.simulation.currentTime.toString("hh:mm:ss")
+            appearTime = utils.timeToString(self.simulation.currentTime)
             initialDelay = 0
         return {
             "__type__": "Train",
@@ -684,8 +699,9 @@ class Train(QtCore.QObject):
     @property
     def actionTime(self):
         """
-        :return: the time at which the current action has been achieved or 0.
-        :rtype: ``QTime`` or 0
+        :return: the time in seconds at which the current action has been
+                 achieved or None.
+        :rtype: float or None
         """
         return self._actionTime
 
@@ -755,13 +771,13 @@ class Train(QtCore.QObject):
     def appearTimeStr(self):
         """Returns the time at which this train appears on the scene as a
         String."""
-        return self._appearTime.toString("HH:mm:ss")
+        return utils.timeToString(self._appearTime)
 
     @appearTimeStr.setter
     def appearTimeStr(self, value):
         """Setter function for the appearTime property"""
         if self.simulation.context == utils.Context.EDITOR_TRAINS:
-            self._appearTime = QtCore.QTime.fromString(value)
+            self._appearTime = utils.timeFromString(value)
 
     @property
     def shunting(self):
@@ -800,6 +816,32 @@ class Train(QtCore.QObject):
             self._status != TrainStatus.INACTIVE and \
             self._status != TrainStatus.OUT
 
+    def mayStartMoving(self, secs):
+        """
+        :param float secs: A duration in seconds of sim time
+        :return: True if this train is not moving but may start moving
+                 within secs, i.e. it enters the area, it is stopped at a
+                 station and may depart, or it is stopped elsewhere.
+        :rtype: bool
+        """
+        currentTime = self.simulation.currentTime
+        if self._status == TrainStatus.INACTIVE:
+            if self._appearTime is None:
+                return False
+            realAppearTime = self._appearTime + self.initialDelay
+            return self.simulation.startTime - 3600 <= realAppearTime < \
+                currentTime + secs
+        if not self.isActive() or self._speed > 0:
+            return False
+        if self._status != TrainStatus.STOPPED or \
+                self.currentService is None or self.nextPlaceIndex is None:
+            return True
+        line = self.currentService.lines[self.nextPlaceIndex]
+        departureTime = line.scheduledDepartureTime
+        return departureTime is not None and \
+            departureTime < currentTime + secs and \
+            self._stoppedTime + secs > self.minimumStopTime
+
     def updateMinimumStopTime(self):
         """Updates the minimum stopping time for next station."""
         self._minimumStopTime = utils.DurationProba(
@@ -835,16 +877,18 @@ class Train(QtCore.QObject):
             self.drawTrain(advanceLength)
             self.executeActions(advanceLength)
 
-    @QtCore.pyqtSlot(QtCore.QTime)
+    @QtCore.pyqtSlot(float)
     def activate(self, time):
         """Activate this Train if time is after this
         :class:`~ts2.trains.train.Train`'s
         :meth:`~ts2.trains.train.Train.appearTime`.
+
+        :param float time: The current sim time in seconds
         """
-        if self.status == TrainStatus.INACTIVE:
-            realAppearTime = self._appearTime.addSecs(self.initialDelay)
-            if self.simulation.startTime.addSecs(-3600) \
-                    <= realAppearTime < time:
+        if self.status == TrainStatus.INACTIVE and \
+                self._appearTime is not None:
+            realAppearTime = self._appearTime + self.initialDelay
+            if self.simulation.startTime - 3600 <= realAppearTime < time:
                 self._speed = self._initialSpeed
                 # Signals update
                 signalAhead = self.findNextSignal()
@@ -866,6 +910,12 @@ class Train(QtCore.QObject):
                     self.nextPlaceIndex = 0
                 self.drawTrain()
                 self.executeActions(0)
+                place = self._trainHead.trackItem.place
+                self.simulation.recordEvent(
+                    events.EventType.ENTERED, self.trainId,
+                    place.placeCode if place is not None else "",
+                    self.initialDelay
+                )
                 # Print messages
                 if abs(self.initialDelay) < 60:
                     self.simulation.messageLogger.addMessage(
@@ -979,7 +1029,7 @@ class Train(QtCore.QObject):
             "speed": 0.0,
             "initialSpeed": 0.0,
             "trainHead": self.trainHead - headTrainType.length - 1.0,
-            "appearTime": self.simulation.currentTime.toString(),
+            "appearTime": utils.timeToString(self.simulation.currentTime),
             "initialDelay": 0,
             "nextPlaceIndex": None,
             "stoppedTime": 1.0
@@ -1028,7 +1078,7 @@ class Train(QtCore.QObject):
                     # We see this signal for the first time
                     self._lastSignal = nsp.trackItem
                     self._applicableActionIndex = 0
-                    self._actionTime = 0
+                    self._actionTime = None
             else:
                 # This signal does not require actions, so we only update our
                 # memory of the last signal
@@ -1038,13 +1088,13 @@ class Train(QtCore.QObject):
         currentTime = self.simulation.currentTime
         if abs(self.speed - applicableAction[1]) < 0.1:
             # We have achieved the target speed
-            if self._actionTime == 0:
+            if self._actionTime is None:
                 self._actionTime = currentTime
             if len(applicableAction) >= 3:
                 timeToWait = applicableAction[2]
             else:
                 timeToWait = 0
-            if currentTime > self._actionTime.addSecs(timeToWait):
+            if currentTime > self._actionTime + timeToWait:
                 # We have waited enough, so we go to next action
                 if len(self.signalActions) > self.applicableActionIndex + 1:
                     self._applicableActionIndex += 1
@@ -1108,10 +1158,10 @@ class Train(QtCore.QObject):
                         self.trainStoppedAtStation.emit(self.trainId)
                     elif self.status == TrainStatus.STOPPED:
                         # Train is already stopped at the place
-                        if line.scheduledDepartureTime > \
-                                self.simulation.currentTime or \
-                                self._stoppedTime < self.minimumStopTime or \
-                                line.scheduledDepartureTime == QtCore.QTime():
+                        departureTime = line.scheduledDepartureTime
+                        if departureTime is None or \
+                                departureTime > self.simulation.currentTime or \
+                                self._stoppedTime < self.minimumStopTime:
                             # Conditions to depart are not met
                             self.status = TrainStatus.STOPPED
                             self._stoppedTime += secs
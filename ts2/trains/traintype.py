@@ -118,6 +118,7 @@ class TrainTypesModel(QtCore.QAbstractTableModel):
         return flags
 
 
+@utils.typeRegistry.register
 class TrainType:
     """The ``TrainType`` class holds information relating to rolling stock types.
     """
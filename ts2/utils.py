@@ -18,6 +18,7 @@
 #   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
 #
 
+import collections
 import random
 
 from Qt import QtCore
@@ -69,6 +70,180 @@ class MissingDependencyException(Exception):
         super().__init__(arg)
 
 
+class TypeRegistry:
+    """A TypeRegistry maps the ``__type__`` of saved objects to the callables
+    that build them from their data dict.
+
+    Classes register themselves with the :meth:`register` decorator. A
+    registry can be derived from a parent registry to override some of its
+    types, as the editor does for ``Simulation``.
+    """
+
+    def __init__(self, parent=None):
+        """Constructor for the TypeRegistry class.
+
+        :param parent: The :class:`TypeRegistry` in which to look up types
+                       that are not registered in this one.
+        """
+        if parent is not None:
+            self._constructors = parent._constructors.new_child()
+        else:
+            self._constructors = collections.ChainMap()
+
+    def register(self, cls):
+        """Class decorator registering cls under its class name. Objects are
+        built with ``cls(parameters=dct)``."""
+        self.registerFactory(cls.__name__,
+                             lambda dct: cls(parameters=dct))
+        return cls
+
+    def registerFactory(self, typeName, factory):
+        """Registers factory to build objects of __type__ typeName.
+
+        :param str typeName: The ``__type__`` of the objects
+        :param factory: A callable taking the data dict of the object and
+                        returning the object
+        """
+        self._constructors[typeName] = factory
+
+    def constructor(self, typeName):
+        """
+        :return: The callable building objects of __type__ typeName
+        :raises FormatException: if typeName is not registered
+        """
+        try:
+            return self._constructors[typeName]
+        except KeyError:
+            raise FormatException(
+                QtCore.QCoreApplication.translate(
+                    "TypeRegistry", "Unknown __type__ '%s' in file"
+                ) % typeName
+            )
+
+    def objectHook(self, dct):
+        """Hook method for json.load(). Builds the object described by dct,
+        or returns dct unchanged if it has no ``__type__``. Any other
+        ``__type__``, even empty, must be registered.
+
+        :raises FormatException: if the ``__type__`` of dct is not
+                                 registered
+        """
+        typeName = dct.get('__type__')
+        if typeName is None:
+            return dct
+        return self.constructor(typeName)(dct)
+
+
+typeRegistry = TypeRegistry()
+"""Registry of the types that can be loaded from a simulation file"""
+
+
+def snapshot(data):
+    """Returns a deep copy of data made only of dicts, lists and scalars.
+
+    Objects having a ``for_json()`` method are replaced by a snapshot of its
+    result. The copy does not share any mutable object with data, so that it
+    can be serialised in another thread while data keeps changing.
+    """
+    forJson = getattr(data, "for_json", None)
+    if forJson is not None:
+        data = forJson()
+    if isinstance(data, dict):
+        return {key: snapshot(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [snapshot(value) for value in data]
+    return data
+
+
+def timeFromString(text):
+    """Parses a simulation time.
+
+    Simulation times are counted in seconds from the sim epoch, i.e.
+    midnight of the first day of the simulation. Hours may be greater than
+    23 for the times of the following days, e.g. "25:30:00".
+
+    :param str text: The time as "HH:mm:ss" or "HH:mm"
+    :return: the time in seconds, or None if text is empty or is not a valid
+             time.
+    :rtype: int
+    """
+    try:
+        parts = [int(part) for part in text.strip().split(":")]
+    except (AttributeError, ValueError):
+        return None
+    if len(parts) == 2:
+        parts.append(0)
+    if len(parts) != 3:
+        return None
+    hours, minutes, seconds = parts
+    if hours < 0 or not 0 <= minutes < 60 or not 0 <= seconds < 60:
+        return None
+    return hours * 3600 + minutes * 60 + seconds
+
+
+DAY = 86400
+"""Number of seconds in a day"""
+
+MIDNIGHT_MARGIN = 6 * 3600
+"""Times of day more than this number of seconds before the start time of a
+simulation are times of the following day. See :func:`nextDayTime`."""
+
+
+def nextDayTime(seconds, startTime):
+    """Moves the times of a timetable which crosses midnight to the
+    following day.
+
+    Timetables are written as times of the day, so that in a simulation
+    starting at 22:00, "00:30:00" is half an hour after midnight and not
+    21 and a half hours before the start. Such times, i.e. those more than
+    MIDNIGHT_MARGIN before startTime, are moved to the following day. This
+    only applies to simulations starting on their first day, since times
+    of the following days are saved with hours greater than 23.
+
+    :param seconds: A time parsed by :func:`timeFromString`, or None
+    :param int startTime: The start time of the simulation
+    :return: seconds, moved to the following day if needed
+    """
+    if seconds is not None and startTime < DAY and \
+            seconds < startTime - MIDNIGHT_MARGIN:
+        return seconds + DAY
+    return seconds
+
+
+def timeToString(seconds, withSeconds=True):
+    """Formats a simulation time, as parsed by :func:`timeFromString`.
+
+    :param seconds: The time in seconds from the sim epoch, or None
+    :param bool withSeconds: If False, the time is formatted as "HH:mm"
+    :return: the time as "HH:mm:ss", or an empty string if seconds is None
+    :rtype: str
+    """
+    if seconds is None:
+        return ""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if withSeconds:
+        return "%02i:%02i:%02i" % (hours, minutes, secs)
+    return "%02i:%02i" % (hours, minutes)
+
+
+def toQTime(seconds):
+    """
+    :param seconds: A simulation time in seconds from the sim epoch
+    :return: the time of the day of seconds, for display in the GUI
+    :rtype: ``QtCore.QTime``
+    """
+    if seconds is None:
+        return QtCore.QTime()
+    return QtCore.QTime(0, 0).addMSecs(round(seconds * 1000) % 86400000)
+
+
+def timeSortKey(seconds):
+    """Sort key of simulation times where None, i.e. no time, comes
+    first."""
+    return -1 if seconds is None else seconds
+
+
 def cumsum(lis):
     """Cumulated sum of a list
 
@@ -18,7 +18,9 @@
 #   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
 #
 
+import collections
 import os
+import zipfile
 
 from Qt import QtCore, QtWidgets
 
@@ -30,6 +32,50 @@ class XSettings(QtCore.QSettings):
 
     INITIAL_SETUP = "initial_setup"
     LOAD_LAST = "load_last"
+    ARCHIVE_CODEC = "archive_codec"
+    ARCHIVE_LEVEL = "archive_level"
+
+    ARCHIVE_CODECS = collections.OrderedDict([
+        ("store", zipfile.ZIP_STORED),
+        ("deflate", zipfile.ZIP_DEFLATED),
+        ("bzip2", zipfile.ZIP_BZIP2),
+        ("lzma", zipfile.ZIP_LZMA)
+    ])
+    """Compression codecs available for .ts2 archives"""
+
+    DEFAULT_ARCHIVE_CODEC = "deflate"
+
+    SAVE_MODE = "save_mode"
+
+    SAVE_MODES = ("full", "delta")
+    """Save modes: the whole simulation, or only the state of the game as
+    changes to the simulation file it was loaded from"""
+
+    DEFAULT_SAVE_MODE = "full"
+
+    LOGGER_CAPACITY = "logger_capacity"
+    LOGGER_SPILL = "logger_spill"
+
+    DEFAULT_LOGGER_CAPACITY = 1000
+    DEFAULT_LOGGER_SPILL = True
+
+    AUTOSAVE_MODE = "autosave_mode"
+    AUTOSAVE_INTERVAL = "autosave_interval"
+    AUTOSAVE_COUNT = "autosave_count"
+
+    AUTOSAVE_MODES = ("off", "sim", "wall")
+    """Autosave modes: disabled, every interval of simulation time or every
+    interval of wall clock time"""
+
+    DEFAULT_AUTOSAVE_MODE = "wall"
+    DEFAULT_AUTOSAVE_INTERVAL = 5
+    DEFAULT_AUTOSAVE_COUNT = 3
+
+    UI_REFRESH_RATE = "ui_refresh_rate"
+    """Maximum number of updates per second of the train and service views,
+    whatever the speed of the simulation"""
+
+    DEFAULT_UI_REFRESH_RATE = 5
 
     class HACKERS:
         npi = "npi"
@@ -117,6 +163,63 @@ class XSettings(QtCore.QSettings):
     def userDataDir(self):
         return os.path.join(self._getUserDataDirectory(), "data")
 
+    def archiveCodec(self):
+        """Name of the codec used to compress .ts2 archives
+
+        :rtype: str
+        """
+        codec = self.value(self.ARCHIVE_CODEC, self.DEFAULT_ARCHIVE_CODEC)
+        if codec not in self.ARCHIVE_CODECS:
+            codec = self.DEFAULT_ARCHIVE_CODEC
+        return codec
+
+    def archiveCompression(self):
+        """Compression to use when writing .ts2 archives
+
+        :return: ``(compress_type, compresslevel)`` to pass to
+                 ``zipfile.ZipFile.writestr()``. compresslevel is ``None``
+                 for the default level of the codec.
+        """
+        compressType = self.ARCHIVE_CODECS[self.archiveCodec()]
+        level = self.compressionLevel(compressType,
+                                      self.i(self.ARCHIVE_LEVEL, -1))
+        return compressType, level
+
+    @staticmethod
+    def compressionLevel(compressType, level):
+        """
+        :return: level adapted to the range accepted by compressType, i.e.
+                 0 to 9 for deflate, 1 to 9 for bzip2, or ``None`` for the
+                 default level of the codec if level is negative or if the
+                 codec has no levels.
+        """
+        if level is None or level < 0 or \
+                compressType in (zipfile.ZIP_STORED, zipfile.ZIP_LZMA):
+            return None
+        if compressType == zipfile.ZIP_BZIP2:
+            return min(max(level, 1), 9)
+        return min(level, 9)
+
+    def saveMode(self):
+        """Save mode of games, one of SAVE_MODES
+
+        :rtype: str
+        """
+        mode = self.value(self.SAVE_MODE, self.DEFAULT_SAVE_MODE)
+        if mode not in self.SAVE_MODES:
+            mode = self.DEFAULT_SAVE_MODE
+        return mode
+
+    def autosaveMode(self):
+        """Autosave mode, one of AUTOSAVE_MODES
+
+        :rtype: str
+        """
+        mode = self.value(self.AUTOSAVE_MODE, self.DEFAULT_AUTOSAVE_MODE)
+        if mode not in self.AUTOSAVE_MODES:
+            mode = self.DEFAULT_AUTOSAVE_MODE
+        return mode
+
     def i(self, ki, default=None):
         """Return  value as int"""
         v = self.value(ki, default)